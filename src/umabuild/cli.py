@@ -4,11 +4,25 @@ from pathlib import Path
 
 import typer
 from rich.console import Console
+from rich.table import Table
 
 from .core.doctor import run_doctor
 from .core.generator import GenerationError, generate_app
-from .core.llm.openai_provider import OpenAIProvider
+from .core.history import (
+    HistoryError,
+    checkout as checkout_generation,
+    list_generations,
+    read_head,
+    record_generation,
+    rollback as rollback_generation,
+)
+from .core.llm.mock_server import FaultConfig, MockServer, load_recordings
+from .core.llm.registry import ProviderConfig, create_provider
+from .core.loadtest import run_load_test
+from .core.lock import WorkspaceLock, single_flight
 from .core.patcher import apply_generation, ensure_generated_readme
+from .core.preview import PreviewServer, ensure_export, refresh_export
+from .core.router import AUTO_MODEL, ModelRouter
 from .core.runner import bootstrap_expo, run_expo_web
 from .core.workspace import Workspace
 
@@ -16,6 +30,18 @@ app = typer.Typer(add_completion=False)
 console = Console()
 
 
+def _router(model: str, config: ProviderConfig) -> ModelRouter | None:
+    if model != AUTO_MODEL:
+        return None
+    if not config.models:
+        console.print(
+            f"[red]Provider {config.name!r} has no models configured for --model auto. "
+            "Pass --model <name> or set \"models\" in .umabuild/providers.json.[/red]"
+        )
+        raise typer.Exit(1)
+    return ModelRouter(tiers=list(config.models))
+
+
 @app.command()
 def doctor(
     no_expo: bool = typer.Option(False, "--no-expo", help="Skip Expo CLI check."),
@@ -28,73 +54,160 @@ def doctor(
 @app.command()
 def new(
     workspace: Path = typer.Option(..., "--workspace", exists=True, file_okay=False, dir_okay=True),
-    provider: str = typer.Option("openai", "--provider"),
-    model: str = typer.Option("gpt-4o-mini", "--model"),
+    provider: str = typer.Option(
+        "openai", "--provider", help="openai, llamacpp, vllm or a configured/plugin provider."
+    ),
+    model: str = typer.Option(
+        AUTO_MODEL, "--model", help="Model name, or 'auto' to route by change size."
+    ),
     project_dir: str = typer.Option("app", "--project-dir"),
     no_install: bool = typer.Option(False, "--no-install"),
+    quiet: bool = typer.Option(False, "--quiet", help="Log npm/Expo output to .umabuild/logs."),
 ) -> None:
     """Create a new Expo app from README spec."""
     ws = Workspace(root=workspace, project_dir=project_dir)
     spec = ws.read_spec()
-    ws.save_spec_snapshot(spec)
-
-    if provider != "openai":
-        console.print("[red]Only openai provider is implemented in this MVP.[/red]")
-        raise typer.Exit(1)
 
     try:
-        llm = OpenAIProvider()
+        llm, provider_config = create_provider(provider, ws)
     except ValueError as exc:
         console.print(f"[red]{exc}[/red]")
         raise typer.Exit(1)
+    router = _router(model, provider_config)
 
-    console.print("[cyan]Bootstrapping Expo app...[/cyan]")
-    bootstrap_expo(ws.root, ws.project_dir, no_install)
+    with single_flight(ws, spec) as reused:
+        if reused:
+            console.print(f"[green]Reusing {reused.id} from a concurrent run of this spec.[/green]")
+            return
+        ws.save_spec_snapshot(spec)
 
-    console.print("[cyan]Generating app code...[/cyan]")
-    try:
-        result = generate_app(ws, llm, model=model, mode="new")
-    except GenerationError as exc:
-        console.print(f"[red]{exc}[/red]")
-        raise typer.Exit(1)
+        console.print("[cyan]Bootstrapping Expo app...[/cyan]")
+        log_path = ws.run_log_path("bootstrap") if quiet else None
+        bootstrap_expo(ws.root, ws.project_dir, no_install, log_path=log_path)
 
-    apply_generation(ws, result.output, mode="new")
-    ensure_generated_readme(ws)
-    console.print("[green]Generation complete.[/green]")
+        console.print("[cyan]Generating app code...[/cyan]")
+        try:
+            result = generate_app(
+                ws, llm, model=model, mode="new", router=router, spec_text=spec
+            )
+        except GenerationError as exc:
+            console.print(f"[red]{exc}[/red]")
+            raise typer.Exit(1)
+
+        try:
+            apply_generation(ws, result.output, mode="new")
+        finally:
+            result.cleanup()
+        ensure_generated_readme(ws)
+        generation = record_generation(ws, mode="new")
+        console.print(f"[green]Generation complete ({generation.id}).[/green]")
+        refresh_export(ws)
 
 
 @app.command()
 def iterate(
     workspace: Path = typer.Option(..., "--workspace", exists=True, file_okay=False, dir_okay=True),
-    provider: str = typer.Option("openai", "--provider"),
-    model: str = typer.Option("gpt-4o-mini", "--model"),
+    provider: str = typer.Option(
+        "openai", "--provider", help="openai, llamacpp, vllm or a configured/plugin provider."
+    ),
+    model: str = typer.Option(
+        AUTO_MODEL, "--model", help="Model name, or 'auto' to route by change size."
+    ),
     project_dir: str = typer.Option("app", "--project-dir"),
 ) -> None:
     """Iterate on an existing Expo app using README spec."""
     ws = Workspace(root=workspace, project_dir=project_dir)
     spec = ws.read_spec()
-    ws.save_spec_snapshot(spec)
 
-    if provider != "openai":
-        console.print("[red]Only openai provider is implemented in this MVP.[/red]")
+    try:
+        llm, provider_config = create_provider(provider, ws)
+    except ValueError as exc:
+        console.print(f"[red]{exc}[/red]")
         raise typer.Exit(1)
+    router = _router(model, provider_config)
+
+    with single_flight(ws, spec) as reused:
+        if reused:
+            console.print(f"[green]Reusing {reused.id} from a concurrent run of this spec.[/green]")
+            return
+        ws.save_spec_snapshot(spec)
+
+        console.print("[cyan]Regenerating managed files...[/cyan]")
+        try:
+            result = generate_app(
+                ws, llm, model=model, mode="iterate", router=router, spec_text=spec
+            )
+        except GenerationError as exc:
+            console.print(f"[red]{exc}[/red]")
+            raise typer.Exit(1)
+
+        try:
+            apply_generation(ws, result.output, mode="iterate")
+        finally:
+            result.cleanup()
+        ensure_generated_readme(ws)
+        generation = record_generation(ws, mode="iterate")
+        console.print(f"[green]Iteration complete ({generation.id}).[/green]")
+        refresh_export(ws)
 
+
+@app.command()
+def history(
+    workspace: Path = typer.Option(..., "--workspace", exists=True, file_okay=False, dir_okay=True),
+    project_dir: str = typer.Option("app", "--project-dir"),
+) -> None:
+    """List recorded generations, newest first (* marks HEAD)."""
+    ws = Workspace(root=workspace, project_dir=project_dir)
     try:
-        llm = OpenAIProvider()
-    except ValueError as exc:
+        generations = list_generations(ws)
+    except HistoryError as exc:
         console.print(f"[red]{exc}[/red]")
         raise typer.Exit(1)
+    if not generations:
+        console.print("[yellow]No generation history recorded yet.[/yellow]")
+        return
+    head = read_head(ws)
+    for generation in generations:
+        marker = "*" if generation.id == head else " "
+        console.print(
+            f"{marker} {generation.id}  {generation.created}  {generation.mode}  "
+            f"{len(generation.files)} files"
+        )
 
-    console.print("[cyan]Regenerating managed files...[/cyan]")
+
+@app.command()
+def rollback(
+    workspace: Path = typer.Option(..., "--workspace", exists=True, file_okay=False, dir_okay=True),
+    project_dir: str = typer.Option("app", "--project-dir"),
+) -> None:
+    """Restore the generation before the current one."""
+    ws = Workspace(root=workspace, project_dir=project_dir)
     try:
-        result = generate_app(ws, llm, model=model, mode="iterate")
-    except GenerationError as exc:
+        with WorkspaceLock(ws):
+            generation = rollback_generation(ws)
+    except (HistoryError, FileNotFoundError) as exc:
         console.print(f"[red]{exc}[/red]")
         raise typer.Exit(1)
+    console.print(f"[green]Rolled back to {generation.id}.[/green]")
+    refresh_export(ws)
 
-    apply_generation(ws, result.output, mode="iterate")
-    ensure_generated_readme(ws)
-    console.print("[green]Iteration complete.[/green]")
+
+@app.command()
+def checkout(
+    gen_id: str = typer.Argument(..., help="Generation id (or unique prefix)."),
+    workspace: Path = typer.Option(..., "--workspace", exists=True, file_okay=False, dir_okay=True),
+    project_dir: str = typer.Option("app", "--project-dir"),
+) -> None:
+    """Restore managed files from a recorded generation."""
+    ws = Workspace(root=workspace, project_dir=project_dir)
+    try:
+        with WorkspaceLock(ws):
+            generation = checkout_generation(ws, gen_id)
+    except (HistoryError, FileNotFoundError) as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(1)
+    console.print(f"[green]Checked out {generation.id}.[/green]")
+    refresh_export(ws)
 
 
 @app.command()
@@ -102,6 +215,7 @@ def run(
     workspace: Path = typer.Option(..., "--workspace", exists=True, file_okay=False, dir_okay=True),
     project_dir: str = typer.Option("app", "--project-dir"),
     port: int | None = typer.Option(None, "--port"),
+    quiet: bool = typer.Option(False, "--quiet", help="Log npm/Expo output to .umabuild/logs."),
 ) -> None:
     """Run Expo web preview."""
     ws = Workspace(root=workspace, project_dir=project_dir)
@@ -109,11 +223,184 @@ def run(
         console.print("[red]Project directory not found. Run `umabuild new` first.[/red]")
         raise typer.Exit(1)
     console.print("[cyan]Starting Expo web preview...[/cyan]")
-    url = run_expo_web(ws.project_path, port=port)
+    log_path = ws.run_log_path("run") if quiet else None
+    url = run_expo_web(ws.project_path, port=port, log_path=log_path)
     if url:
         console.print(f"[green]Preview URL: {url}[/green]")
     else:
         console.print("[yellow]Could not detect URL. Check the Expo output above.[/yellow]")
+        if log_path:
+            console.print(f"[yellow]Full output: {log_path}[/yellow]")
+
+
+@app.command()
+def preview(
+    workspace: Path = typer.Option(..., "--workspace", exists=True, file_okay=False, dir_okay=True),
+    project_dir: str = typer.Option("app", "--project-dir"),
+    host: str = typer.Option("127.0.0.1", "--host"),
+    port: int = typer.Option(8080, "--port"),
+    quiet: bool = typer.Option(False, "--quiet", help="Log Expo output to .umabuild/logs."),
+) -> None:
+    """Serve a static web export (re-exported only when managed files change)."""
+    ws = Workspace(root=workspace, project_dir=project_dir)
+    if not ws.project_path.exists():
+        console.print("[red]Project directory not found. Run `umabuild new` first.[/red]")
+        raise typer.Exit(1)
+    console.print("[cyan]Preparing static web export...[/cyan]")
+    try:
+        export_path = ensure_export(ws, log_path=ws.run_log_path("export") if quiet else None)
+    except RuntimeError as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(1)
+    server = PreviewServer(ws, host=host, port=port)
+    console.print(f"[green]Serving {export_path.name} at {server.url}[/green]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+def _fault_config(
+    latency_ms: float,
+    jitter_ms: float,
+    rate_429: float,
+    rate_5xx: float,
+    rate_malformed: float,
+    chunk_delay_ms: float,
+    seed: int | None,
+) -> FaultConfig:
+    return FaultConfig(
+        latency_ms=latency_ms,
+        jitter_ms=jitter_ms,
+        rate_limit_rate=rate_429,
+        server_error_rate=rate_5xx,
+        malformed_rate=rate_malformed,
+        chunk_delay_ms=chunk_delay_ms,
+        seed=seed,
+    )
+
+
+@app.command("mock-server")
+def mock_server(
+    host: str = typer.Option("127.0.0.1", "--host"),
+    port: int = typer.Option(8787, "--port"),
+    recordings: Path | None = typer.Option(
+        None, "--recordings", exists=True, dir_okay=False, help="JSONL of recorded responses."
+    ),
+    latency_ms: float = typer.Option(0.0, "--latency-ms"),
+    jitter_ms: float = typer.Option(0.0, "--jitter-ms"),
+    rate_429: float = typer.Option(0.0, "--rate-429", help="Fraction of requests answered with 429."),
+    rate_5xx: float = typer.Option(0.0, "--rate-5xx", help="Fraction of requests answered with 503."),
+    rate_malformed: float = typer.Option(0.0, "--rate-malformed", help="Fraction of truncated JSON bodies."),
+    chunk_delay_ms: float = typer.Option(0.0, "--chunk-delay-ms", help="Delay between response chunks."),
+    seed: int | None = typer.Option(None, "--seed"),
+) -> None:
+    """Serve a local OpenAI-compatible mock for offline testing."""
+    server = MockServer(
+        host=host,
+        port=port,
+        recordings=load_recordings(recordings) if recordings else None,
+        faults=_fault_config(
+            latency_ms, jitter_ms, rate_429, rate_5xx, rate_malformed, chunk_delay_ms, seed
+        ),
+    )
+    console.print(f"[green]Mock server listening on {server.base_url}[/green]")
+    console.print(f"Use: OPENAI_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command()
+def loadtest(
+    requests: int = typer.Option(50, "--requests"),
+    concurrency: int = typer.Option(8, "--concurrency"),
+    provider: str = typer.Option("openai", "--provider"),
+    workspace: Path | None = typer.Option(
+        None,
+        "--workspace",
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        help="Workspace whose .umabuild/providers.json configures the provider.",
+    ),
+    model: str | None = typer.Option(
+        None, "--model", help="Defaults to the provider's first configured model."
+    ),
+    base_url: str | None = typer.Option(None, "--base-url", help="Override the target server."),
+    live: bool = typer.Option(
+        False, "--live", help="Use the provider's configured endpoint instead of a bundled mock."
+    ),
+    recordings: Path | None = typer.Option(None, "--recordings", exists=True, dir_okay=False),
+    latency_ms: float = typer.Option(0.0, "--latency-ms"),
+    jitter_ms: float = typer.Option(0.0, "--jitter-ms"),
+    rate_429: float = typer.Option(0.0, "--rate-429"),
+    rate_5xx: float = typer.Option(0.0, "--rate-5xx"),
+    rate_malformed: float = typer.Option(0.0, "--rate-malformed"),
+    chunk_delay_ms: float = typer.Option(0.0, "--chunk-delay-ms"),
+    seed: int | None = typer.Option(None, "--seed"),
+) -> None:
+    """Run concurrent generations against a (mock) server and report latency."""
+    ws = Workspace(root=workspace) if workspace else None
+    overrides: dict[str, object] = {}
+    server: MockServer | None = None
+    if base_url:
+        overrides["base_url"] = base_url
+    elif not live:
+        server = MockServer(
+            recordings=load_recordings(recordings) if recordings else None,
+            faults=_fault_config(
+                latency_ms, jitter_ms, rate_429, rate_5xx, rate_malformed, chunk_delay_ms, seed
+            ),
+        ).start()
+        overrides.update(base_url=server.base_url, require_api_key=False)
+
+    try:
+        try:
+            llm, provider_config = create_provider(provider, ws, overrides)
+        except ValueError as exc:
+            console.print(f"[red]{exc}[/red]")
+            raise typer.Exit(1)
+        if model is None:
+            if not provider_config.models:
+                console.print(
+                    f"[red]Provider {provider!r} has no models configured; pass --model.[/red]"
+                )
+                raise typer.Exit(1)
+            model = provider_config.models[0]
+
+        target = getattr(llm, "base_url", provider)
+        console.print(
+            f"[cyan]Running {requests} generations ({concurrency} concurrent) "
+            f"against {target} via {provider}...[/cyan]"
+        )
+        report = run_load_test(llm, requests=requests, concurrency=concurrency, model=model)
+    finally:
+        if server:
+            server.stop()
+
+    table = Table(title="Load test")
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    table.add_row("Succeeded", str(report.succeeded))
+    table.add_row("Failed", str(report.failed))
+    table.add_row("Wall time (s)", f"{report.wall_seconds:.2f}")
+    table.add_row("Throughput (ok/s)", f"{report.throughput:.2f}")
+    table.add_row("Request rate (req/s)", f"{report.request_rate:.2f}")
+    for pct in (50, 90, 99):
+        table.add_row(f"Latency p{pct} (ms)", f"{report.percentile(pct) * 1000:.1f}")
+    table.add_row("Latency max (ms)", f"{report.percentile(100) * 1000:.1f}")
+    if server:
+        table.add_row("Upstream requests", str(server.stats.requests))
+        for status, count in sorted(server.stats.statuses.items()):
+            table.add_row(f"  HTTP {status}", str(count))
+        table.add_row("  Malformed bodies", str(server.stats.malformed))
+    console.print(table)
+    for error, count in sorted(report.errors.items()):
+        console.print(f"[red]{count} x {error}[/red]")
 
 
 def main() -> None:
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import shutil
+import tempfile
+import weakref
+from dataclasses import dataclass, field, replace
 from typing import Any
 import re
-from pathlib import PurePosixPath
+from pathlib import Path, PurePosixPath
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, PrivateAttr, ValidationError
 from rich.console import Console
 
 from .llm.base import LLMProvider
+from .router import ModelRouter, RouteDecision
+from .ui_baseline import API_SURFACE, BASELINE_PATHS, adopts_baseline
 from .workspace import Workspace
 
 console = Console()
@@ -23,10 +28,8 @@ Prefer a single-screen or minimal navigation unless explicitly requested.
 Baseline UI styling rules (mandatory):
 1) Every screen must have safe-area handling and consistent padding (16-20) with vertical spacing (12-16).
 2) Every screen must render a top header bar with title on the left, optional right action, and a subtle bottom divider.
-3) Always include and use shared UI baseline files:
-   - src/ui/theme.ts
-   - src/ui/Screen.tsx
-   - src/ui/AppHeader.tsx
+3) Always use the shared UI baseline (Screen, AppHeader, theme) described below.
+   It is provided by umabuild; never output its files.
 4) No content flush to screen edges.
 5) Inputs/buttons must be at least 44pt height with comfortable spacing.
 6) Lists must use visually separated rows/cards (padding 12-16, radius ~12, subtle border/shadow).
@@ -39,6 +42,7 @@ Output MUST be strict JSON matching the schema provided.
 JSON_SCHEMA_DESC = """Return JSON with:
 - files: array of { "path": "relative/path", "content": "..." }
 - managed_paths: array of strings
+- theme_overrides: optional object with only the theme keys to change
 - notes: optional string
 """
 
@@ -46,80 +50,167 @@ JSON_SCHEMA_DESC = """Return JSON with:
 class GeneratedFile(BaseModel):
     path: str
     content: str
+    _spill_path: Path | None = PrivateAttr(default=None)
+
+    @classmethod
+    def spilled(cls, path: str, spill_path: Path) -> "GeneratedFile":
+        # Built without validation: the object_hook already checked both fields.
+        file = cls.model_construct(path=path, content="")
+        file._spill_path = spill_path
+        return file
+
+    @property
+    def spill_path(self) -> Path | None:
+        return self._spill_path
+
+    def read_text(self) -> str:
+        if self._spill_path is not None:
+            return self._spill_path.read_text(encoding="utf-8")
+        return self.content
 
 
 class GenerationOutput(BaseModel):
     files: list[GeneratedFile]
     managed_paths: list[str]
+    theme_overrides: dict[str, Any] | None = None
     notes: str | None = None
 
 
 @dataclass
 class GenerationResult:
     output: GenerationOutput
-    raw: str
+    raw_size: int
+    raw_excerpt: str
+    spill_dir: Path | None = None
+    _finalizer: weakref.finalize | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.spill_dir is not None:
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+
+    def cleanup(self) -> None:
+        """Remove spilled file contents once the output has been applied."""
+        if self._finalizer is not None:
+            self._finalizer()
 
 
 class GenerationError(RuntimeError):
     pass
 
 
-REQUIRED_UI_FILES = {
-    "src/ui/theme.ts",
-    "src/ui/Screen.tsx",
-    "src/ui/AppHeader.tsx",
-}
-
 IMPORT_PATTERN = re.compile(
     r"""(?:import\s+[^'"]*from\s+|import\s+|require\()\s*['"]([^'"]+)['"]""",
     re.MULTILINE,
 )
 
+# Retry prompts and results keep only this much of an invalid response.
+EXCERPT_CHARS = 4000
+
 ASSET_EXTS = [".png", ".jpg", ".jpeg", ".svg", ".gif", ".webp", ".json"]
 CODE_EXTS = [".ts", ".tsx", ".js", ".jsx"]
 
 
-def _build_user_prompt(spec_text: str, summary: dict, managed: dict[str, str]) -> str:
+def _build_system_prompt() -> str:
+    return "\n".join(
+        [
+            SYSTEM_PROMPT,
+            API_SURFACE,
+            "Constraints:",
+            "- Output strict JSON only",
+            "- Keep code minimal and runnable",
+            "- Ensure App.tsx uses functional components",
+            "",
+            JSON_SCHEMA_DESC,
+        ]
+    )
+
+
+# Static content goes first and never varies between requests, so the
+# provider can serve it from its prompt prefix cache.
+STATIC_PREFIX = _build_system_prompt()
+
+
+def _order_by_volatility(managed: dict[str, str], churn: dict[str, int]) -> dict[str, str]:
+    ordered = sorted(managed, key=lambda path: (churn.get(path, 0), path))
+    return {path: managed[path] for path in ordered}
+
+
+LEGACY_UI_NOTE = (
+    "Note: this project predates the shared UI baseline. Its src/ui files are listed "
+    "above and owned by the project; keep their existing API, edit them if needed, "
+    "and ignore the baseline API description."
+)
+
+
+def _build_user_prompt(
+    spec_text: str, summary: dict, managed: dict[str, str], legacy_ui: bool = False
+) -> str:
     managed_section = "\n".join(
         f"- {path}:\n```\n{content}\n```" for path, content in managed.items()
     )
     managed_block = managed_section if managed_section else "(none)"
     return "\n".join(
         [
-            "App spec (README.md):",
+            "Currently managed files and contents:",
+            managed_block,
+            *(["", LEGACY_UI_NOTE] if legacy_ui else []),
+            "\nApp spec (README.md):",
             "```",
             spec_text,
             "```",
             "\nStructured summary:",
-            json.dumps(summary, indent=2),
-            "\nCurrently managed files and contents:",
-            managed_block,
-            "\nConstraints:",
-            "- Output strict JSON only",
-            "- Keep code minimal and runnable",
-            "- Ensure App.tsx uses functional components",
-            "\n" + JSON_SCHEMA_DESC,
+            json.dumps(summary, indent=2, sort_keys=True),
         ]
     )
 
 
-def _parse_output(raw: str) -> GenerationOutput:
-    data = json.loads(raw)
-    return GenerationOutput.model_validate(data)
+def _cached_tokens(usage: dict[str, Any] | None) -> int | None:
+    if not usage:
+        return None
+    details = usage.get("prompt_tokens_details") or {}
+    cached = details.get("cached_tokens")
+    return int(cached) if cached is not None else None
+
+
+def _parse_output(raw: str, spill_dir: Path | None = None) -> GenerationOutput:
+    if spill_dir is None:
+        return GenerationOutput.model_validate(json.loads(raw))
+    counter = 0
+
+    def spill(obj: dict[str, Any]) -> Any:
+        # object_hook runs as each file object is decoded, so its content is
+        # written out and released before the rest of the response is parsed.
+        nonlocal counter
+        if set(obj) != {"path", "content"} or not isinstance(obj["path"], str):
+            return obj
+        if not isinstance(obj["content"], str):
+            return obj
+        counter += 1
+        spill_path = spill_dir / f"{counter:05d}"
+        spill_path.write_text(obj["content"], encoding="utf-8")
+        return GeneratedFile.spilled(obj["path"], spill_path)
+
+    return GenerationOutput.model_validate(json.loads(raw, object_hook=spill))
+
+
+def _excerpt(raw: str, limit: int = EXCERPT_CHARS, around: int | None = None) -> str:
+    if len(raw) <= limit:
+        return raw
+    if around is not None:
+        start = max(0, min(around - limit // 2, len(raw) - limit))
+        return (
+            f"[... {start} chars omitted ...]"
+            + raw[start : start + limit]
+            + f"[... {len(raw) - start - limit} chars omitted ...]"
+        )
+    half = limit // 2
+    return raw[:half] + f"\n[... {len(raw) - 2 * half} chars omitted ...]\n" + raw[-half:]
 
 
-def _validate_required_files(output: GenerationOutput) -> None:
-    file_paths = {f.path for f in output.files}
-    managed_paths = set(output.managed_paths)
-    missing_files = REQUIRED_UI_FILES - file_paths
-    missing_managed = REQUIRED_UI_FILES - managed_paths
-    if missing_files or missing_managed:
-        details = []
-        if missing_files:
-            details.append(f"missing files: {sorted(missing_files)}")
-        if missing_managed:
-            details.append(f"missing managed_paths: {sorted(missing_managed)}")
-        raise GenerationError("Required UI baseline files not included: " + "; ".join(details))
+def _drop_baseline_files(output: GenerationOutput) -> None:
+    # The patcher writes the UI baseline itself; ignore any copy the model emits.
+    output.files = [f for f in output.files if f.path not in BASELINE_PATHS]
+    output.managed_paths = [p for p in output.managed_paths if p not in BASELINE_PATHS]
 
 
 def _collect_relative_imports(path: str, content: str) -> set[str]:
@@ -151,20 +242,21 @@ def _candidate_paths(base_dir: PurePosixPath, ref: str) -> list[str]:
 def _validate_imports(
     workspace: Workspace, output: GenerationOutput, mode: str
 ) -> None:
-    output_paths = {f.path for f in output.files}
-    disk_paths: set[str] = set()
-    if mode == "iterate" and workspace.project_path.exists():
-        for file_path in workspace.project_path.rglob("*"):
-            if file_path.is_file():
-                disk_paths.add(file_path.relative_to(workspace.project_path).as_posix())
-    available = output_paths | disk_paths
+    available = {f.path for f in output.files} | set(BASELINE_PATHS)
+    check_disk = mode == "iterate" and workspace.project_path.exists()
+
+    def exists(candidate: str) -> bool:
+        if candidate in available:
+            return True
+        # Probe the project on demand instead of indexing it (node_modules included).
+        return check_disk and (workspace.project_path / candidate).is_file()
 
     missing: set[str] = set()
     for file in output.files:
         base_dir = PurePosixPath(file.path).parent
-        for ref in _collect_relative_imports(file.path, file.content):
+        for ref in _collect_relative_imports(file.path, file.read_text()):
             candidates = _candidate_paths(base_dir, ref)
-            if not any(candidate in available for candidate in candidates):
+            if not any(exists(candidate) for candidate in candidates):
                 missing.add(f"{file.path} -> {ref}")
     if missing:
         missing_list = "; ".join(sorted(missing))
@@ -179,64 +271,122 @@ def generate_app(
     model: str,
     mode: str,
     temperature: float = 0.2,
+    router: ModelRouter | None = None,
+    spec_text: str | None = None,
 ) -> GenerationResult:
-    spec_text = workspace.read_spec()
+    if spec_text is None:
+        spec_text = workspace.read_spec()
     summary = workspace.extract_summary(spec_text)
     managed_paths = workspace.load_managed() if mode == "iterate" else []
+    uses_baseline = adopts_baseline(workspace)
 
     managed_contents: dict[str, str] = {}
     if mode == "iterate":
         for path in managed_paths:
+            if uses_baseline and path in BASELINE_PATHS:
+                continue
             file_path = workspace.project_path / path
             if file_path.exists():
                 managed_contents[path] = file_path.read_text(encoding="utf-8")
+        managed_contents = _order_by_volatility(managed_contents, workspace.load_churn())
 
     messages: list[dict[str, str]] = [
-        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "system", "content": STATIC_PREFIX},
         {
             "role": "user",
-            "content": _build_user_prompt(spec_text, summary, managed_contents),
+            "content": _build_user_prompt(
+                spec_text, summary, managed_contents, legacy_ui=not uses_baseline
+            ),
         },
     ]
 
+    if router:
+        signals = router.signals(
+            workspace, mode, spec_text, managed_contents, messages[1]["content"]
+        )
+        decision = router.route(workspace, mode, signals)
+        console.print(f"[dim]Using {decision.model} ({decision.reason}).[/dim]")
+    else:
+        decision = RouteDecision(model=model, max_tokens=None, reason="fixed")
+
     for attempt in range(3):
-        raw = provider.generate(messages=messages, model=model, temperature=temperature)
-        workspace.log_generation(
-            {
-                "provider": provider.__class__.__name__,
-                "model": model,
-                "messages": messages,
-                "response_raw": raw,
-                "attempt": attempt + 1,
-            }
+        extra: dict[str, Any] = {}
+        if decision.max_tokens:
+            extra["max_tokens"] = decision.max_tokens
+        raw = provider.generate(
+            messages=messages, model=decision.model, temperature=temperature, **extra
         )
+        usage = provider.last_usage
+        # Cut off by our own max_tokens: not a model failure, retry with more room.
+        truncated = provider.last_finish_reason == "length"
+        error: Exception | None = None
+        spill_dir = Path(tempfile.mkdtemp(prefix="umabuild-gen-"))
         try:
-            output = _parse_output(raw)
-            _validate_required_files(output)
-            _validate_imports(workspace, output, mode)
-            return GenerationResult(output=output, raw=raw)
-        except (json.JSONDecodeError, ValidationError) as exc:
+            try:
+                output = _parse_output(raw, spill_dir)
+                if uses_baseline:
+                    _drop_baseline_files(output)
+                _validate_imports(workspace, output, mode)
+            except (json.JSONDecodeError, ValidationError, GenerationError) as exc:
+                error = exc
+            workspace.log_generation(
+                {
+                    "provider": provider.__class__.__name__,
+                    "model": decision.model,
+                    "route": decision.reason,
+                    "max_tokens": decision.max_tokens,
+                    "messages": messages,
+                    "response_raw": raw,
+                    "attempt": attempt + 1,
+                    "usage": usage,
+                    "cached_tokens": _cached_tokens(usage),
+                    "finish_reason": provider.last_finish_reason,
+                    "error": str(error)[:500] if error else None,
+                }
+            )
+            if not truncated:
+                workspace.record_model_outcome(decision.model, ok=error is None)
+            if error is None:
+                return GenerationResult(
+                    output=output,
+                    raw_size=len(raw),
+                    raw_excerpt=_excerpt(raw),
+                    spill_dir=spill_dir,
+                )
+        except BaseException:
+            # Spilled contents must not outlive a failed attempt, whatever went wrong.
+            shutil.rmtree(spill_dir, ignore_errors=True)
+            raise
+        shutil.rmtree(spill_dir, ignore_errors=True)
+        larger = router.grow_budget(decision) if router and truncated else None
+        if larger and attempt < 2:
+            console.print(f"[dim]Output hit max_tokens; retrying with {larger.max_tokens}.[/dim]")
+            decision = larger
+            continue
+        if isinstance(error, GenerationError):
+            if attempt >= 2:
+                raise error
+            fix_prompt = (
+                "Your previous response is invalid. "
+                "Return ONLY strict JSON that matches the schema "
+                "and ensures all imported files/assets exist.\n"
+                f"Error: {error}\n"
+                f"Invalid output ({len(raw)} chars, excerpt):\n{_excerpt(raw)}"
+            )
+        else:
             if attempt >= 2:
                 raise GenerationError(
                     "Model output was not valid JSON after retries. "
                     "Check the generation_log.jsonl for details."
-                ) from exc
+                ) from error
             fix_prompt = (
                 "Your previous response was invalid. "
                 "Return ONLY strict JSON that matches the schema. "
                 "Do not include markdown or explanations.\n"
-                f"Invalid output:\n{raw}"
-            )
-            messages.append({"role": "user", "content": fix_prompt})
-        except GenerationError as exc:
-            if attempt >= 2:
-                raise
-            fix_prompt = (
-                "Your previous response is invalid. "
-                "Return ONLY strict JSON that matches the schema, includes ALL required files, "
-                "and ensures all imported files/assets exist.\n"
-                f"Error: {exc}\n"
-                f"Invalid output:\n{raw}"
+                f"Invalid output ({len(raw)} chars, excerpt):\n"
+                f"{_excerpt(raw, around=getattr(error, 'pos', None))}"
             )
-            messages.append({"role": "user", "content": fix_prompt})
+        messages.append({"role": "user", "content": fix_prompt})
+        if router:
+            decision = router.escalate(decision)
     raise GenerationError("Model output was invalid.")
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from .workspace import Workspace
+
+
+class HistoryError(RuntimeError):
+    pass
+
+
+@dataclass
+class Generation:
+    id: str
+    parent: str | None
+    mode: str
+    spec: str
+    files: dict[str, str] = field(default_factory=dict)
+    managed: list[str] = field(default_factory=list)
+    ui_baseline: str | None = None
+    created: str = ""
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "parent": self.parent,
+            "mode": self.mode,
+            "spec": self.spec,
+            "files": self.files,
+            "managed": self.managed,
+            "ui_baseline": self.ui_baseline,
+            "created": self.created,
+        }
+
+
+def _blob_path(workspace: Workspace, digest: str) -> Path:
+    return workspace.objects_dir / digest[:2] / digest[2:]
+
+
+def _atomic_write(target: Path, data: bytes) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+
+
+def store_blob(workspace: Workspace, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    target = _blob_path(workspace, digest)
+    if not target.exists():
+        _atomic_write(target, data)
+    return digest
+
+
+def read_blob(workspace: Workspace, digest: str) -> bytes:
+    target = _blob_path(workspace, digest)
+    if not target.exists():
+        raise HistoryError(f"Missing object {digest} in {workspace.objects_dir}")
+    return target.read_bytes()
+
+
+def read_head(workspace: Workspace) -> str | None:
+    if not workspace.head_path.exists():
+        return None
+    head = workspace.head_path.read_text(encoding="utf-8").strip()
+    return head or None
+
+
+def _write_head(workspace: Workspace, gen_id: str) -> None:
+    _atomic_write(workspace.head_path, (gen_id + "\n").encode("utf-8"))
+
+
+def load_generation(workspace: Workspace, gen_id: str) -> Generation:
+    path = workspace.generations_dir / f"{gen_id}.json"
+    if not path.exists():
+        raise HistoryError(f"Unknown generation: {gen_id}")
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return Generation(
+        id=data["id"],
+        parent=data.get("parent"),
+        mode=data.get("mode", ""),
+        spec=data["spec"],
+        files=dict(data.get("files", {})),
+        managed=list(data.get("managed", [])),
+        ui_baseline=data.get("ui_baseline"),
+        created=data.get("created", ""),
+    )
+
+
+def resolve_generation(workspace: Workspace, ref: str) -> str:
+    if not workspace.generations_dir.exists():
+        raise HistoryError("No generation history recorded yet.")
+    matches = [p.stem for p in workspace.generations_dir.glob(f"{ref}*.json")]
+    if not matches:
+        raise HistoryError(f"Unknown generation: {ref}")
+    if len(matches) > 1:
+        raise HistoryError(f"Ambiguous generation id {ref!r}: {', '.join(sorted(matches))}")
+    return matches[0]
+
+
+def record_generation(workspace: Workspace, mode: str) -> Generation:
+    """Snapshot the managed files, spec snapshot and UI baseline state as a new generation."""
+    project_root = workspace.project_path
+    managed = sorted(workspace.load_managed())
+    files: dict[str, str] = {}
+    for rel_path in managed:
+        file_path = project_root / rel_path
+        if file_path.is_file():
+            files[rel_path] = store_blob(workspace, file_path.read_bytes())
+    spec_bytes = (
+        workspace.spec_snapshot_path.read_bytes()
+        if workspace.spec_snapshot_path.exists()
+        else b""
+    )
+    spec = store_blob(workspace, spec_bytes)
+    ui_baseline = (
+        store_blob(workspace, workspace.ui_baseline_path.read_bytes())
+        if workspace.ui_baseline_path.exists()
+        else None
+    )
+    parent = read_head(workspace)
+    identity = json.dumps(
+        {
+            "parent": parent,
+            "mode": mode,
+            "spec": spec,
+            "files": files,
+            "managed": managed,
+            "ui_baseline": ui_baseline,
+        },
+        sort_keys=True,
+    )
+    gen_id = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:12]
+    generation = Generation(
+        id=gen_id,
+        parent=parent,
+        mode=mode,
+        spec=spec,
+        files=files,
+        managed=managed,
+        ui_baseline=ui_baseline,
+        created=datetime.utcnow().isoformat() + "Z",
+    )
+    target = workspace.generations_dir / f"{gen_id}.json"
+    if not target.exists():
+        _atomic_write(target, json.dumps(generation.to_dict(), indent=2).encode("utf-8"))
+    _write_head(workspace, gen_id)
+    return generation
+
+
+def list_generations(workspace: Workspace) -> list[Generation]:
+    """Return every recorded generation, newest first, including ones not reachable from HEAD."""
+    if not workspace.generations_dir.exists():
+        return []
+    generations = [
+        load_generation(workspace, path.stem) for path in workspace.generations_dir.glob("*.json")
+    ]
+    generations.sort(key=lambda g: (g.created, g.id), reverse=True)
+    return generations
+
+
+def checkout(workspace: Workspace, ref: str) -> Generation:
+    """Restore managed files, spec snapshot and UI baseline state of a previous generation."""
+    generation = load_generation(workspace, resolve_generation(workspace, ref))
+    project_root = workspace.project_path
+    if not project_root.exists():
+        raise FileNotFoundError(f"Project directory missing: {project_root}")
+
+    for rel_path in workspace.load_managed():
+        if rel_path not in generation.files:
+            stale = project_root / rel_path
+            if stale.is_file():
+                stale.unlink()
+
+    for rel_path, digest in generation.files.items():
+        target = project_root / rel_path
+        data = read_blob(workspace, digest)
+        if target.is_file() and target.read_bytes() == data:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+
+    workspace.ensure_meta()
+    workspace.spec_snapshot_path.write_bytes(read_blob(workspace, generation.spec))
+    # Theme overrides drive the next baseline render, so they roll back too.
+    if generation.ui_baseline:
+        workspace.ui_baseline_path.write_bytes(read_blob(workspace, generation.ui_baseline))
+    elif workspace.ui_baseline_path.exists():
+        workspace.ui_baseline_path.unlink()
+    workspace.save_managed(generation.managed)
+    _write_head(workspace, generation.id)
+    return generation
+
+
+def rollback(workspace: Workspace) -> Generation:
+    """Move HEAD to the parent generation and restore it."""
+    head = read_head(workspace)
+    if not head:
+        raise HistoryError("No generation history recorded yet.")
+    parent = load_generation(workspace, head).parent
+    if not parent:
+        raise HistoryError(f"Generation {head} has no earlier generation to roll back to.")
+    return checkout(workspace, parent)
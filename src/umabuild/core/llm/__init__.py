@@ -1,4 +1,11 @@
 from .base import LLMProvider
 from .openai_provider import OpenAIProvider
+from .registry import ProviderConfig, ProviderConfigError, create_provider
 
-__all__ = ["LLMProvider", "OpenAIProvider"]
+__all__ = [
+    "LLMProvider",
+    "OpenAIProvider",
+    "ProviderConfig",
+    "ProviderConfigError",
+    "create_provider",
+]
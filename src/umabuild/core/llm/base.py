@@ -5,6 +5,12 @@ from typing import Any
 
 
 class LLMProvider(ABC):
+    # Token usage reported by the most recent call, if the backend provides it.
+    # Providers shared across threads must keep this per thread.
+    last_usage: dict[str, Any] | None = None
+    # finish_reason of the most recent call ("length" means max_tokens cut it off).
+    last_finish_reason: str | None = None
+
     @abstractmethod
     def generate(
         self,
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+DEFAULT_RESPONSE = json.dumps(
+    {
+        "files": [
+            {
+                "path": "App.tsx",
+                "content": (
+                    "import { Text } from 'react-native';\n"
+                    "import Screen from './src/ui/Screen';\n"
+                    "import AppHeader from './src/ui/AppHeader';\n\n"
+                    "export default function App() {\n"
+                    "  return (\n"
+                    "    <Screen>\n"
+                    "      <AppHeader title=\"Mock\" />\n"
+                    "      <Text>Hello</Text>\n"
+                    "    </Screen>\n"
+                    "  );\n"
+                    "}\n"
+                ),
+            },
+        ],
+        "managed_paths": ["App.tsx"],
+        "notes": "mock response",
+    }
+)
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    chunk_delay_ms: float = 0.0
+    chunk_size: int = 256
+    seed: int | None = None
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    statuses: dict[int, int] = field(default_factory=dict)
+    malformed: int = 0
+
+
+def load_recordings(path: Path) -> list[str]:
+    """Load replayable responses from a JSONL file.
+
+    Accepts `generation_log.jsonl` entries (`response_raw`) as well as plain
+    `{"content": ...}` lines, so real sessions can be replayed directly.
+    """
+    recordings: list[str] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        if isinstance(entry, dict):
+            content = entry.get("response_raw", entry.get("content"))
+        else:
+            content = entry
+        if isinstance(content, str):
+            recordings.append(content)
+    if not recordings:
+        raise ValueError(f"No recorded responses found in {path}")
+    return recordings
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_MockHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def do_POST(self) -> None:
+        mock = self.server.mock
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        fault = mock.faults
+        delay = fault.latency_ms + (mock.rng_uniform(0, fault.jitter_ms) if fault.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+
+        roll = mock.rng_uniform(0, 1)
+        if roll < fault.rate_limit_rate:
+            self._send_json(429, {"error": {"message": "Rate limit (mock)"}}, {"Retry-After": "1"})
+            return
+        roll -= fault.rate_limit_rate
+        if roll < fault.server_error_rate:
+            self._send_json(503, {"error": {"message": "Server error (mock)"}})
+            return
+
+        content = mock.next_response()
+        if mock.rng_uniform(0, 1) < fault.malformed_rate:
+            content = content[: max(1, len(content) // 2)]
+            with mock.lock:
+                mock.stats.malformed += 1
+
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in payload.get("messages", []))
+        completion = {
+            "id": f"mock-{mock.stats.requests}",
+            "object": "chat.completion",
+            "model": payload.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (prompt_chars + len(content)) // 4,
+                "prompt_tokens_details": {"cached_tokens": 0},
+            },
+        }
+        if payload.get("stream"):
+            self._send_stream(content, payload.get("model", "mock"))
+            return
+        self._send_json(200, completion)
+
+    def _record(self, status: int) -> None:
+        mock = self.server.mock
+        with mock.lock:
+            mock.stats.requests += 1
+            mock.stats.statuses[status] = mock.stats.statuses.get(status, 0) + 1
+
+    def _send_json(self, status: int, data: dict, headers: dict[str, str] | None = None) -> None:
+        self._record(status)
+        encoded = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self._write_slowly(encoded)
+
+    def _send_stream(self, content: str, model: str) -> None:
+        self._record(200)
+        fault = self.server.mock.faults
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        size = max(1, fault.chunk_size)
+        for start in range(0, len(content), size):
+            delta = {
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start : start + size]}}],
+            }
+            self.wfile.write(f"data: {json.dumps(delta)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if fault.chunk_delay_ms:
+                time.sleep(fault.chunk_delay_ms / 1000)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def _write_slowly(self, data: bytes) -> None:
+        fault = self.server.mock.faults
+        if not fault.chunk_delay_ms:
+            self.wfile.write(data)
+            return
+        size = max(1, fault.chunk_size)
+        for start in range(0, len(data), size):
+            self.wfile.write(data[start : start + size])
+            self.wfile.flush()
+            time.sleep(fault.chunk_delay_ms / 1000)
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockServer"
+
+
+class MockServer:
+    """OpenAI-compatible stand-in that replays responses and injects faults."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        recordings: list[str] | None = None,
+        faults: FaultConfig | None = None,
+    ) -> None:
+        self.recordings = recordings or [DEFAULT_RESPONSE]
+        self.faults = faults or FaultConfig()
+        self.stats = MockStats()
+        self.lock = threading.Lock()
+        self._rng = random.Random(self.faults.seed)
+        self._cursor = 0
+        self._httpd = _MockHTTPServer((host, port), _Handler)
+        self._httpd.mock = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rng_uniform(self, low: float, high: float) -> float:
+        with self.lock:
+            return self._rng.uniform(low, high)
+
+    def next_response(self) -> str:
+        with self.lock:
+            content = self.recordings[self._cursor % len(self.recordings)]
+            self._cursor += 1
+        return content
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
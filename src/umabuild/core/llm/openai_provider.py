@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import threading
 from typing import Any
 
 import requests
@@ -10,13 +11,66 @@ from .base import LLMProvider
 
 console = Console()
 
+DEFAULT_BASE_URL = "https://api.openai.com"
+
 
 class OpenAIProvider(LLMProvider):
-    def __init__(self) -> None:
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com").rstrip("/")
-        if not self.api_key:
-            raise ValueError("OPENAI_API_KEY is required for OpenAI provider.")
+    """Client for OpenAI-compatible chat completion endpoints.
+
+    Arguments default to `OPENAI_API_KEY` / `OPENAI_BASE_URL`; the provider
+    also covers local llama.cpp- or vLLM-style servers when configured with a
+    base URL and `require_api_key=False`.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_key_env: str = "OPENAI_API_KEY",
+        base_url: str | None = None,
+        timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        concurrency: int | None = None,
+        require_api_key: bool = True,
+        json_mode: bool = False,
+        label: str = "OpenAI",
+    ) -> None:
+        self.api_key = api_key if api_key is not None else os.getenv(api_key_env)
+        self.api_key_env = api_key_env
+        base_url = base_url or os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL)
+        self.base_url = base_url.rstrip("/").removesuffix("/v1")
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.json_mode = json_mode
+        self.label = label
+        if require_api_key and not self.api_key:
+            raise ValueError(f"{api_key_env} is required for {label} provider.")
+        self._slots = threading.BoundedSemaphore(concurrency) if concurrency else None
+        self._local = threading.local()
+
+    @property
+    def last_usage(self) -> dict[str, Any] | None:
+        # Per thread, so concurrent calls on a shared provider keep their own usage.
+        return getattr(self._local, "usage", None)
+
+    @last_usage.setter
+    def last_usage(self, usage: dict[str, Any] | None) -> None:
+        self._local.usage = usage
+
+    @property
+    def last_finish_reason(self) -> str | None:
+        return getattr(self._local, "finish_reason", None)
+
+    @last_finish_reason.setter
+    def last_finish_reason(self, reason: str | None) -> None:
+        self._local.finish_reason = reason
+
+    def _session(self) -> requests.Session:
+        # One keep-alive session per thread; requests.Session is not thread-safe.
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
 
     def generate(
         self,
@@ -26,28 +80,44 @@ class OpenAIProvider(LLMProvider):
         **kwargs: Any,
     ) -> str:
         url = f"{self.base_url}/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
         payload: dict[str, Any] = {
             "model": model,
             "messages": messages,
             "temperature": temperature,
         }
+        if self.json_mode:
+            payload["response_format"] = {"type": "json_object"}
         payload.update(kwargs)
+        self.last_usage = None
+        self.last_finish_reason = None
+        if self._slots:
+            self._slots.acquire()
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
+            resp = self._session().post(
+                url, headers=headers, json=payload, timeout=(self.connect_timeout, self.timeout)
+            )
         except requests.RequestException as exc:
-            raise RuntimeError(f"Network error calling OpenAI API: {exc}") from exc
+            raise RuntimeError(f"Network error calling {self.label} API: {exc}") from exc
+        finally:
+            if self._slots:
+                self._slots.release()
         if resp.status_code == 401:
-            raise RuntimeError("OpenAI API authentication failed. Check OPENAI_API_KEY.")
+            raise RuntimeError(f"{self.label} API authentication failed. Check {self.api_key_env}.")
         if resp.status_code == 429:
-            raise RuntimeError("OpenAI API rate limit hit. Try again later.")
+            raise RuntimeError(f"{self.label} API rate limit hit. Try again later.")
         if resp.status_code >= 400:
-            raise RuntimeError(f"OpenAI API error {resp.status_code}: {resp.text}")
+            raise RuntimeError(f"{self.label} API error {resp.status_code}: {resp.text}")
         data = resp.json()
+        usage = data.get("usage") if isinstance(data, dict) else None
+        self.last_usage = usage if isinstance(usage, dict) else None
         try:
-            return data["choices"][0]["message"]["content"]
+            choice = data["choices"][0]
+            content = choice["message"]["content"]
         except (KeyError, IndexError, TypeError) as exc:
-            raise RuntimeError("Invalid response format from OpenAI API.") from exc
+            raise RuntimeError(f"Invalid response format from {self.label} API.") from exc
+        reason = choice.get("finish_reason")
+        self.last_finish_reason = reason if isinstance(reason, str) else None
+        return content
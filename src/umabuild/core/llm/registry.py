@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field, fields
+from importlib.metadata import EntryPoint, entry_points
+from typing import Any, Callable
+
+from ..router import DEFAULT_TIERS
+from ..workspace import Workspace
+from .base import LLMProvider
+from .openai_provider import OpenAIProvider
+
+ENTRY_POINT_GROUP = "umabuild.providers"
+
+
+class ProviderConfigError(ValueError):
+    pass
+
+
+@dataclass
+class ProviderConfig:
+    """Per-provider settings, from built-in defaults or `.umabuild/providers.json`."""
+
+    name: str
+    kind: str = "openai"
+    base_url: str | None = None
+    api_key_env: str = "OPENAI_API_KEY"
+    require_api_key: bool = True
+    concurrency: int | None = None
+    timeout: float = 60.0
+    connect_timeout: float = 10.0
+    # Model tiers (fast first) used when --model is auto.
+    models: list[str] = field(default_factory=list)
+    # Known flags: json_mode (send response_format=json_object).
+    capabilities: dict[str, bool] = field(default_factory=dict)
+
+
+ProviderFactory = Callable[[ProviderConfig], LLMProvider]
+
+
+def _openai_factory(config: ProviderConfig) -> LLMProvider:
+    return OpenAIProvider(
+        api_key_env=config.api_key_env,
+        base_url=config.base_url,
+        timeout=config.timeout,
+        connect_timeout=config.connect_timeout,
+        concurrency=config.concurrency,
+        require_api_key=config.require_api_key,
+        json_mode=config.capabilities.get("json_mode", False),
+        label="OpenAI" if config.name == "openai" else config.name,
+    )
+
+
+BUILTIN_FACTORIES: dict[str, ProviderFactory] = {"openai": _openai_factory}
+
+BUILTIN_PROVIDERS: dict[str, ProviderConfig] = {
+    "openai": ProviderConfig(name="openai", models=list(DEFAULT_TIERS)),
+    "llamacpp": ProviderConfig(
+        name="llamacpp",
+        base_url="http://127.0.0.1:8080",
+        api_key_env="LLAMACPP_API_KEY",
+        require_api_key=False,
+        concurrency=4,
+        timeout=600.0,
+        connect_timeout=2.0,
+        capabilities={"json_mode": True},
+    ),
+    "vllm": ProviderConfig(
+        name="vllm",
+        base_url="http://127.0.0.1:8000",
+        api_key_env="VLLM_API_KEY",
+        require_api_key=False,
+        concurrency=32,
+        timeout=600.0,
+        connect_timeout=2.0,
+        capabilities={"json_mode": True},
+    ),
+}
+
+
+def _plugin_entry_points() -> dict[str, EntryPoint]:
+    return {entry.name: entry for entry in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def load_factory(kind: str) -> ProviderFactory:
+    """Return the factory for `kind`, importing only that plugin if needed."""
+    if kind in BUILTIN_FACTORIES:
+        return BUILTIN_FACTORIES[kind]
+    entry = _plugin_entry_points().get(kind)
+    if entry is None:
+        raise ProviderConfigError(f"No provider implementation registered for kind {kind!r}.")
+    try:
+        factory = entry.load()
+    except Exception as exc:
+        raise ProviderConfigError(
+            f"Failed to load provider plugin {kind!r} ({entry.value}): {exc}"
+        ) from exc
+    if not callable(factory):
+        raise ProviderConfigError(f"Provider plugin {kind!r} ({entry.value}) is not callable.")
+    return factory
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_setting(name: str, key: str, value: Any) -> None:
+    def fail(expected: str) -> None:
+        raise ProviderConfigError(
+            f"Setting {key!r} for provider {name!r} must be {expected}, got {value!r}."
+        )
+
+    if key in ("kind", "api_key_env"):
+        if not isinstance(value, str) or not value:
+            fail("a non-empty string")
+    elif key == "base_url":
+        if value is not None and not isinstance(value, str):
+            fail("a string or null")
+    elif key == "require_api_key":
+        if not isinstance(value, bool):
+            fail("true or false")
+    elif key == "concurrency":
+        if value is not None and (
+            not isinstance(value, int) or isinstance(value, bool) or value < 1
+        ):
+            fail("a positive integer or null")
+    elif key in ("timeout", "connect_timeout"):
+        if not _is_number(value) or value <= 0:
+            fail("a positive number")
+    elif key == "models":
+        if not isinstance(value, list) or not all(isinstance(m, str) and m for m in value):
+            fail("a list of model names")
+    elif key == "capabilities":
+        if not isinstance(value, dict) or not all(
+            isinstance(k, str) and isinstance(v, bool) for k, v in value.items()
+        ):
+            fail("an object of boolean flags")
+
+
+def _config_from_dict(name: str, data: dict[str, Any], base: ProviderConfig | None) -> ProviderConfig:
+    known = {f.name for f in fields(ProviderConfig)} - {"name"}
+    unknown = set(data) - known
+    if unknown:
+        raise ProviderConfigError(f"Unknown settings for provider {name!r}: {sorted(unknown)}")
+    for key, value in data.items():
+        _check_setting(name, key, value)
+    values = {f.name: getattr(base, f.name) for f in fields(ProviderConfig)} if base else {}
+    values.update(data)
+    values["name"] = name
+    return ProviderConfig(**values)
+
+
+def load_provider_configs(workspace: Workspace | None = None) -> dict[str, ProviderConfig]:
+    configs = {name: _config_from_dict(name, {}, cfg) for name, cfg in BUILTIN_PROVIDERS.items()}
+    for kind in _plugin_entry_points():
+        configs.setdefault(kind, ProviderConfig(name=kind, kind=kind))
+    if workspace is None or not workspace.providers_path.exists():
+        return configs
+    try:
+        data = json.loads(workspace.providers_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise ProviderConfigError(f"Invalid {workspace.providers_path}: {exc}") from exc
+    if not isinstance(data, dict):
+        raise ProviderConfigError(f"{workspace.providers_path} must map provider names to settings.")
+    for name, settings in data.items():
+        if not isinstance(settings, dict):
+            raise ProviderConfigError(f"Settings for provider {name!r} must be an object.")
+        configs[name] = _config_from_dict(name, settings, configs.get(name))
+    return configs
+
+
+def create_provider(
+    name: str,
+    workspace: Workspace | None = None,
+    overrides: dict[str, Any] | None = None,
+) -> tuple[LLMProvider, ProviderConfig]:
+    configs = load_provider_configs(workspace)
+    if name not in configs:
+        raise ProviderConfigError(
+            f"Unknown provider {name!r}. Available: {', '.join(sorted(configs))}"
+        )
+    config = configs[name]
+    if overrides:
+        config = _config_from_dict(name, overrides, config)
+    factory = load_factory(config.kind)
+    try:
+        return factory(config), config
+    except ValueError:
+        raise
+    except Exception as exc:
+        raise ProviderConfigError(f"Provider plugin {config.kind!r} failed to start: {exc}") from exc
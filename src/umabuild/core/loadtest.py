@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import math
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .generator import generate_app
+from .llm.base import LLMProvider
+from .workspace import Workspace
+
+DEFAULT_SPEC = """# Load Test App
+
+## Screens
+- Home
+
+## Features
+- Simple greeting
+"""
+
+
+@dataclass
+class LoadTestReport:
+    requests: int
+    concurrency: int
+    wall_seconds: float
+    latencies: list[float] = field(default_factory=list)
+    errors: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        # Successful generations per second; failures are not throughput.
+        return self.succeeded / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def request_rate(self) -> float:
+        return self.requests / self.wall_seconds if self.wall_seconds else 0.0
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return 0.0
+        # Nearest-rank: the smallest latency with at least pct% of samples at or below it.
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+def _one_generation(provider: LLMProvider, model: str, spec: str, base: Path, index: int) -> float:
+    root = base / f"ws-{index}"
+    root.mkdir()
+    (root / "README.md").write_text(spec, encoding="utf-8")
+    workspace = Workspace(root=root)
+    start = time.perf_counter()
+    result = generate_app(workspace, provider, model=model, mode="new")
+    elapsed = time.perf_counter() - start
+    result.cleanup()
+    return elapsed
+
+
+def run_load_test(
+    provider: LLMProvider,
+    requests: int,
+    concurrency: int,
+    model: str = "gpt-4o-mini",
+    spec: str = DEFAULT_SPEC,
+) -> LoadTestReport:
+    """Run many concurrent `generate_app` calls and collect latency/error stats."""
+    report = LoadTestReport(requests=requests, concurrency=concurrency, wall_seconds=0.0)
+    with tempfile.TemporaryDirectory(prefix="umabuild-loadtest-") as tmp:
+        base = Path(tmp)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(_one_generation, provider, model, spec, base, index)
+                for index in range(requests)
+            ]
+            for future in futures:
+                try:
+                    report.latencies.append(future.result())
+                except RuntimeError as exc:
+                    key = f"{exc.__class__.__name__}: {str(exc).splitlines()[0][:80]}"
+                    report.errors[key] = report.errors.get(key, 0) + 1
+        report.wall_seconds = time.perf_counter() - start
+    return report
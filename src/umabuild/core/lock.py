@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+from rich.console import Console
+
+from .history import Generation, HistoryError, load_generation, read_blob, read_head
+from .workspace import Workspace
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+console = Console()
+
+POLL_INTERVAL = 0.2
+
+
+def _try_lock(handle: IO[bytes]) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(handle: IO[bytes]) -> None:
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    else:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class WorkspaceLock:
+    """Exclusive, process-wide lock on a workspace's `.umabuild/lock` file.
+
+    The OS releases the lock if the holder dies, so a crashed run never leaves
+    the workspace stuck.
+    """
+
+    def __init__(self, workspace: Workspace) -> None:
+        self.workspace = workspace
+        self._handle: IO[bytes] | None = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        self.workspace.ensure_meta()
+        handle = self.workspace.lock_path.open("a+b")
+        while not _try_lock(handle):
+            if not blocking:
+                handle.close()
+                return False
+            time.sleep(POLL_INTERVAL)
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()).encode("ascii"))
+        handle.flush()
+        self._handle = handle
+        return True
+
+    def release(self) -> None:
+        if self._handle is None:
+            return
+        try:
+            _unlock(self._handle)
+        finally:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> "WorkspaceLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+
+def spec_hash(spec_text: str) -> str:
+    return hashlib.sha256(spec_text.replace("\r\n", "\n").encode("utf-8")).hexdigest()
+
+
+def _same_spec(workspace: Workspace, generation: Generation, spec_text: str) -> bool:
+    try:
+        recorded = read_blob(workspace, generation.spec).decode("utf-8")
+    except (HistoryError, UnicodeDecodeError):
+        return False
+    return spec_hash(recorded) == spec_hash(spec_text)
+
+
+def _finished_generation(workspace: Workspace, spec_text: str) -> Generation | None:
+    record = workspace.load_inflight()
+    if record.get("state") != "done" or record.get("spec") != spec_hash(spec_text):
+        return None
+    # A rollback or checkout since then means the workspace no longer holds it.
+    head = read_head(workspace)
+    if not head or record.get("generation") != head:
+        return None
+    try:
+        generation = load_generation(workspace, head)
+    except HistoryError:
+        return None
+    return generation if _same_spec(workspace, generation, spec_text) else None
+
+
+@contextmanager
+def single_flight(workspace: Workspace, spec_text: str) -> Iterator[Generation | None]:
+    """Serialize generations on a workspace and share results between waiters.
+
+    The lock holder records the hash of the spec it is generating in
+    `.umabuild/inflight.json` and marks it done with the generation id once the
+    body completes. A run that had to wait reuses that generation when the hash
+    matches the spec it read before waiting; otherwise it yields None and the
+    caller generates while holding the lock. Runs with a different spec simply
+    queue behind the in-flight one.
+    """
+    lock = WorkspaceLock(workspace)
+    waited = not lock.acquire(blocking=False)
+    if waited:
+        console.print("[yellow]Another generation is running on this workspace; waiting...[/yellow]")
+        lock.acquire()
+    try:
+        reuse = _finished_generation(workspace, spec_text) if waited else None
+        if reuse is not None:
+            yield reuse
+            return
+        digest = spec_hash(spec_text)
+        head_before = read_head(workspace)
+        workspace.save_inflight({"spec": digest, "state": "running"})
+        yield None
+        head = read_head(workspace)
+        if head and head != head_before:
+            workspace.save_inflight({"spec": digest, "state": "done", "generation": head})
+    finally:
+        lock.release()
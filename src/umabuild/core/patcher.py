@@ -1,19 +1,73 @@
 from __future__ import annotations
 
+import filecmp
+import shutil
 from pathlib import Path
 
 from rich.console import Console
 
-from .generator import GenerationOutput
+from .generator import GeneratedFile, GenerationOutput
+from .ui_baseline import (
+    BASELINE_PATHS,
+    BASELINE_VERSION,
+    adopts_baseline,
+    merge_overrides,
+    render_baseline,
+    version_tuple,
+)
 from .workspace import Workspace
 
 console = Console()
 
 
-def _write_file(base: Path, rel_path: str, content: str) -> None:
+def _write_file(base: Path, rel_path: str, content: str) -> bool:
     target = base / rel_path
+    if target.exists() and target.read_text(encoding="utf-8") == content:
+        return False
     target.parent.mkdir(parents=True, exist_ok=True)
     target.write_text(content, encoding="utf-8")
+    return True
+
+
+def _write_generated(base: Path, file: GeneratedFile) -> bool:
+    if file.spill_path is None:
+        return _write_file(base, file.path, file.content)
+    target = base / file.path
+    if target.exists() and filecmp.cmp(file.spill_path, target, shallow=False):
+        return False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(file.spill_path, target)
+    return True
+
+
+def write_ui_baseline(workspace: Workspace, overrides: dict | None = None) -> list[str] | None:
+    """Write the shipped UI baseline, merging new theme overrides onto stored ones.
+
+    Returns the changed paths, or None when the workspace keeps its own UI files.
+    """
+    if not adopts_baseline(workspace):
+        console.print(
+            "[yellow]src/ui files predate the umabuild UI baseline; keeping them. "
+            f"Delete {', '.join(BASELINE_PATHS)} to adopt baseline v{BASELINE_VERSION}.[/yellow]"
+        )
+        return None
+    stored_version = (workspace.load_ui_baseline() or {}).get("version")
+    if stored_version and version_tuple(stored_version) > version_tuple(BASELINE_VERSION):
+        console.print(
+            f"[yellow]UI baseline v{stored_version} is newer than this umabuild "
+            f"(v{BASELINE_VERSION}); leaving it unchanged.[/yellow]"
+        )
+        return []
+    if stored_version and stored_version != BASELINE_VERSION:
+        console.print(f"[cyan]Upgrading UI baseline v{stored_version} -> v{BASELINE_VERSION}.[/cyan]")
+    overrides = merge_overrides(workspace.load_theme_overrides(), overrides)
+    changed = [
+        rel_path
+        for rel_path, content in render_baseline(overrides).items()
+        if _write_file(workspace.project_path, rel_path, content)
+    ]
+    workspace.save_ui_baseline(BASELINE_VERSION, overrides)
+    return changed
 
 
 def apply_generation(
@@ -24,27 +78,36 @@ def apply_generation(
     project_root = workspace.project_path
     if not project_root.exists():
         raise FileNotFoundError(f"Project directory missing: {project_root}")
+    if mode not in ("new", "iterate"):
+        raise ValueError("mode must be 'new' or 'iterate'")
 
+    baseline_changed = write_ui_baseline(workspace, output.theme_overrides)
+    files = output.files
     existing_managed = workspace.load_managed()
     existing_set = set(existing_managed)
     new_managed = [p.replace("\\", "/") for p in output.managed_paths]
+    if baseline_changed is not None:
+        files = [f for f in files if f.path not in BASELINE_PATHS]
+        new_managed.extend(BASELINE_PATHS)
+    else:
+        baseline_changed = []
 
     if mode == "new":
-        for file in output.files:
-            _write_file(project_root, file.path, file.content)
-        managed_union = sorted(set(existing_set).union(new_managed))
-        workspace.save_managed(managed_union)
-        return
-
-    if mode == "iterate":
-        for file in output.files:
-            if file.path in existing_set:
-                _write_file(project_root, file.path, file.content)
-        managed_union = sorted(set(existing_set).union(new_managed))
-        workspace.save_managed(managed_union)
-        return
-
-    raise ValueError("mode must be 'new' or 'iterate'")
+        changed = [
+            file.path
+            for file in files
+            if _write_generated(project_root, file)
+        ]
+    else:
+        changed = [
+            file.path
+            for file in files
+            if file.path in existing_set
+            and _write_generated(project_root, file)
+        ]
+    workspace.record_churn(changed + baseline_changed)
+    managed_union = sorted(set(existing_set).union(new_managed))
+    workspace.save_managed(managed_union)
 
 
 def ensure_generated_readme(workspace: Workspace) -> None:
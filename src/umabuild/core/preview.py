@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import unquote, urlsplit
+
+from rich.console import Console
+
+from .runner import export_expo_web
+from .workspace import Workspace
+
+console = Console()
+
+# Files outside the managed set that still change the exported bundle.
+PROJECT_INPUTS = ["package.json", "app.json"]
+CURRENT_FILE = "CURRENT"
+KEEP_EXPORTS = 5
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+GZIP_MIN_SIZE = 1024
+# Expo writes content-hashed filenames under these prefixes.
+IMMUTABLE_PREFIXES = ("/_expo/static/", "/assets/")
+
+
+def content_hash(workspace: Workspace) -> str:
+    """Hash every input that affects `expo export` output."""
+    digest = hashlib.sha256()
+    paths = sorted(set(workspace.load_managed()) | set(PROJECT_INPUTS))
+    for rel_path in paths:
+        file_path = workspace.project_path / rel_path
+        if not file_path.is_file():
+            continue
+        digest.update(rel_path.encode("utf-8") + b"\0")
+        digest.update(file_path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def current_export(workspace: Workspace) -> Path | None:
+    pointer = workspace.exports_dir / CURRENT_FILE
+    if not pointer.exists():
+        return None
+    target = workspace.exports_dir / pointer.read_text(encoding="utf-8").strip()
+    return target if (target / "index.html").exists() else None
+
+
+def _set_current(workspace: Workspace, digest: str) -> None:
+    pointer = workspace.exports_dir / CURRENT_FILE
+    tmp = pointer.with_name(f".{CURRENT_FILE}.{os.getpid()}.tmp")
+    tmp.write_text(digest, encoding="utf-8")
+    os.replace(tmp, pointer)
+
+
+def _prune_exports(workspace: Workspace, keep: str) -> None:
+    exports = [
+        p for p in workspace.exports_dir.iterdir() if p.is_dir() and not p.name.startswith(".")
+    ]
+    exports.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in exports[KEEP_EXPORTS:]:
+        if stale.name != keep:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def ensure_export(workspace: Workspace, log_path: Path | None = None) -> Path:
+    """Export the web bundle unless one for the current inputs already exists."""
+    digest = content_hash(workspace)
+    target = workspace.exports_dir / digest
+    if (target / "index.html").exists():
+        _set_current(workspace, digest)
+        return target
+    workspace.exports_dir.mkdir(parents=True, exist_ok=True)
+    staging = workspace.exports_dir / f".{digest}.{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        export_expo_web(workspace.project_path, staging.resolve(), log_path=log_path)
+        if not target.exists():
+            os.replace(staging, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    _set_current(workspace, digest)
+    _prune_exports(workspace, keep=digest)
+    return target
+
+
+def refresh_export(workspace: Workspace) -> Path | None:
+    """Re-export after a generation, but only for workspaces that use preview."""
+    if not workspace.exports_dir.exists() or not workspace.project_path.exists():
+        return None
+    if current_export(workspace) == workspace.exports_dir / content_hash(workspace):
+        return None
+    console.print("[cyan]Refreshing static web export...[/cyan]")
+    try:
+        return ensure_export(workspace, log_path=workspace.run_log_path("export"))
+    except RuntimeError as exc:
+        console.print(f"[yellow]Static export failed: {exc}[/yellow]")
+        return None
+
+
+class _CachedFile:
+    def __init__(self, data: bytes, content_type: str) -> None:
+        self.content_type = content_type
+        self.data = data
+        self.etag = '"' + hashlib.sha256(data).hexdigest()[:20] + '"'
+        self.gzipped: bytes | None = None
+        if len(data) >= GZIP_MIN_SIZE and content_type.startswith(COMPRESSIBLE_TYPES):
+            self.gzipped = gzip.compress(data, compresslevel=6)
+
+
+class _PreviewHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_PreviewHTTPServer"
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool) -> None:
+        url_path = unquote(urlsplit(self.path).path) or "/"
+        cached, immutable = self.server.lookup(url_path)
+        if cached is None:
+            self.send_error(404)
+            return
+        cache_control = "public, max-age=31536000, immutable" if immutable else "no-cache"
+        if self.headers.get("If-None-Match") == cached.etag:
+            self.send_response(304)
+            self.send_header("ETag", cached.etag)
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = cached.data
+        accepts_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        self.send_response(200)
+        self.send_header("Content-Type", cached.content_type)
+        self.send_header("ETag", cached.etag)
+        self.send_header("Cache-Control", cache_control)
+        if cached.gzipped is not None:
+            self.send_header("Vary", "Accept-Encoding")
+            if accepts_gzip:
+                body = cached.gzipped
+                self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+class _PreviewHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], root: Callable[[], Path]) -> None:
+        super().__init__(address, _PreviewHandler)
+        self.root = root
+        # Holds files of one export root only; a re-export switches roots and
+        # drops the previous bundle instead of keeping every version in memory.
+        self._cache: dict[Path, _CachedFile] = {}
+        self._cache_root: Path | None = None
+        self._lock = threading.Lock()
+
+    def _resolve(self, root: Path, url_path: str) -> Path | None:
+        candidate = (root / url_path.lstrip("/")).resolve()
+        if candidate != root and root not in candidate.parents:
+            return None
+        if candidate.is_dir():
+            candidate = candidate / "index.html"
+        if candidate.is_file():
+            return candidate
+        html = candidate.with_suffix(".html")
+        if not candidate.suffix and html.is_file():
+            return html
+        # Client-side routes fall back to the SPA entry point.
+        if not candidate.suffix:
+            index = root / "index.html"
+            return index if index.is_file() else None
+        return None
+
+    def lookup(self, url_path: str) -> tuple[_CachedFile | None, bool]:
+        root = self.root().resolve()
+        file_path = self._resolve(root, url_path)
+        if file_path is None:
+            return None, False
+        with self._lock:
+            if root != self._cache_root:
+                self._cache.clear()
+                self._cache_root = root
+            cached = self._cache.get(file_path)
+        if cached is None:
+            content_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+            cached = _CachedFile(file_path.read_bytes(), content_type)
+            with self._lock:
+                if root == self._cache_root:
+                    self._cache[file_path] = cached
+        return cached, url_path.startswith(IMMUTABLE_PREFIXES)
+
+
+class PreviewServer:
+    """Serve the current static export of a workspace.
+
+    The export directory is looked up per request, so a re-export triggered by
+    another `umabuild iterate` is picked up without restarting the server.
+    """
+
+    def __init__(self, workspace: Workspace, host: str = "127.0.0.1", port: int = 8080) -> None:
+        self.workspace = workspace
+        self._httpd = _PreviewHTTPServer((host, port), self._root)
+
+    def _root(self) -> Path:
+        return current_export(self.workspace) or self.workspace.exports_dir
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def shutdown(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field, replace
+
+from .history import HistoryError, load_generation, read_blob, read_head
+from .workspace import Workspace
+
+AUTO_MODEL = "auto"
+DEFAULT_TIERS = ["gpt-4o-mini", "gpt-4o"]
+
+HEADING_PATTERN = re.compile(r"^#{1,6}\s*(.+?)\s*$")
+WORD_PATTERN = re.compile(r"[a-z0-9]{3,}")
+
+
+@dataclass
+class RouteDecision:
+    model: str
+    max_tokens: int | None
+    reason: str
+    tier: int = 0
+
+
+@dataclass
+class RouteSignals:
+    prompt_tokens: int
+    changed_sections: int
+    affected_files: int
+    output_tokens: int
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def split_sections(spec_text: str) -> dict[str, str]:
+    sections: dict[str, list[str]] = {"": []}
+    current = ""
+    for line in spec_text.splitlines():
+        match = HEADING_PATTERN.match(line.strip())
+        if match:
+            current = match.group(1).lower()
+            sections.setdefault(current, [])
+            continue
+        if line.strip():
+            sections[current].append(line.strip())
+    return {name: "\n".join(lines) for name, lines in sections.items() if name or lines}
+
+
+def changed_sections(previous: str | None, current: str) -> dict[str, str]:
+    """Return the sections of `current` that differ from `previous`."""
+    now = split_sections(current)
+    if previous is None:
+        return now
+    before = split_sections(previous)
+    changed = {name: body for name, body in now.items() if before.get(name) != body}
+    for name in before.keys() - now.keys():
+        changed[name] = before[name]
+    return changed
+
+
+def affected_files(changed: dict[str, str], managed_paths: list[str]) -> list[str]:
+    """Guess which managed files a spec change touches from shared words."""
+    if not changed:
+        return []
+    words = set(WORD_PATTERN.findall(" ".join(f"{k} {v}" for k, v in changed.items()).lower()))
+    affected = []
+    for path in managed_paths:
+        stem = path.rsplit("/", 1)[-1].split(".", 1)[0].lower()
+        if stem == "app" or any(word in stem for word in words):
+            affected.append(path)
+    return affected
+
+
+def _previous_spec(workspace: Workspace) -> str | None:
+    head = read_head(workspace)
+    if not head:
+        return None
+    try:
+        generation = load_generation(workspace, head)
+        return read_blob(workspace, generation.spec).decode("utf-8")
+    except (HistoryError, UnicodeDecodeError):
+        return None
+
+
+@dataclass
+class ModelRouter:
+    """Pick a model tier and output budget per request.
+
+    Small iterate edits start on the fastest tier; full scaffolds and large
+    changes start on the strongest. A tier whose failure rate over its recent
+    attempts is too high is skipped, and `escalate` moves up one tier after a
+    failed attempt.
+    """
+
+    tiers: list[str] = field(default_factory=lambda: list(DEFAULT_TIERS))
+    small_prompt_tokens: int = 6000
+    small_changed_sections: int = 2
+    small_affected_files: int = 3
+    max_failure_rate: float = 0.3
+    min_samples: int = 5
+    min_output_tokens: int = 2048
+    max_output_tokens: int = 16384
+
+    def signals(
+        self,
+        workspace: Workspace,
+        mode: str,
+        spec_text: str,
+        managed: dict[str, str],
+        prompt: str,
+    ) -> RouteSignals:
+        previous = _previous_spec(workspace) if mode == "iterate" else None
+        changed = changed_sections(previous, spec_text)
+        affected = affected_files(changed, list(managed))
+        # Iterate responses return every managed file, not just the affected
+        # ones, so budget for the whole set as JSON-escaped strings.
+        output_tokens = sum(estimate_tokens(json.dumps(content)) for content in managed.values())
+        return RouteSignals(
+            prompt_tokens=estimate_tokens(prompt),
+            changed_sections=len(changed),
+            affected_files=len(affected),
+            output_tokens=output_tokens,
+        )
+
+    def _output_budget(self, signals: RouteSignals) -> int:
+        budget = signals.output_tokens * 2
+        return max(self.min_output_tokens, min(self.max_output_tokens, budget))
+
+    def _healthy(self, workspace: Workspace, model: str) -> bool:
+        stats = workspace.load_model_stats().get(model) or {}
+        recent = stats.get("recent")
+        if not isinstance(recent, list) or len(recent) < self.min_samples:
+            return True
+        return sum(recent) / len(recent) <= self.max_failure_rate
+
+    def route(self, workspace: Workspace, mode: str, signals: RouteSignals) -> RouteDecision:
+        small = (
+            mode == "iterate"
+            and signals.prompt_tokens <= self.small_prompt_tokens
+            and signals.changed_sections <= self.small_changed_sections
+            and signals.affected_files <= self.small_affected_files
+            and signals.output_tokens * 2 <= self.max_output_tokens
+        )
+        if small:
+            tier, reason = 0, "small edit"
+            max_tokens: int | None = self._output_budget(signals)
+        else:
+            tier, reason = len(self.tiers) - 1, "new app" if mode == "new" else "large change"
+            max_tokens = self.max_output_tokens
+        while tier < len(self.tiers) - 1 and not self._healthy(workspace, self.tiers[tier]):
+            tier += 1
+            reason += f", skipped unreliable {self.tiers[tier - 1]}"
+        return RouteDecision(model=self.tiers[tier], max_tokens=max_tokens, reason=reason, tier=tier)
+
+    def grow_budget(self, decision: RouteDecision) -> RouteDecision | None:
+        """Return a retry with a larger output budget, or None if already at the cap."""
+        if decision.max_tokens is None or decision.max_tokens >= self.max_output_tokens:
+            return None
+        return replace(
+            decision,
+            max_tokens=min(self.max_output_tokens, decision.max_tokens * 2),
+            reason="retry after output hit max_tokens",
+        )
+
+    def escalate(self, decision: RouteDecision) -> RouteDecision:
+        tier = min(decision.tier + 1, len(self.tiers) - 1)
+        return replace(
+            decision,
+            model=self.tiers[tier],
+            tier=tier,
+            max_tokens=self.max_output_tokens,
+            reason="escalated after failed attempt",
+        )
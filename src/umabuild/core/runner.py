@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import re
 import subprocess
+import time
+from collections import deque
 from pathlib import Path
 
 from rich.console import Console
@@ -9,29 +11,118 @@ from rich.console import Console
 console = Console()
 
 URL_PATTERN = re.compile(r"(http://localhost:\d+|http://127\.0\.0\.1:\d+)")
-
-
-def _stream_command(cmd: list[str], cwd: Path | None = None) -> str:
+ERROR_PATTERN = re.compile(r"(?i)(\berror\b|\bfailed\b|npm ERR!|Unable to resolve)")
+DEP_MARKERS = (
+    "react-dom",
+    "react-native-web",
+    "expo install",
+    "typescript",
+    "TypeScript",
+    "@types/react",
+    "@react-native-async-storage/async-storage",
+    "Unable to resolve",
+)
+
+LOG_BUFFER_SIZE = 1 << 20
+TAIL_LINES = 200
+REFRESH_INTERVAL = 0.25
+CI_REFRESH_INTERVAL = 10.0
+
+
+class _OutputSink:
+    """Routes subprocess output to the terminal, or to a log file in quiet mode.
+
+    Quiet mode writes raw bytes to `log_path` through a large buffer and only
+    shows a throttled progress line, plus any error lines, on the terminal.
+    """
+
+    def __init__(self, label: str, log_path: Path | None = None) -> None:
+        self.label = label
+        self.log_path = log_path
+        self.lines = 0
+        self.tail: deque[str] = deque(maxlen=TAIL_LINES)
+        self._log = None
+        self._status = None
+        self._last_refresh = 0.0
+        if log_path is not None:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log = log_path.open("ab", buffering=LOG_BUFFER_SIZE)
+            if console.is_terminal:
+                self._status = console.status(f"{label}...")
+                self._status.start()
+
+    @property
+    def quiet(self) -> bool:
+        return self._log is not None
+
+    def write(self, raw: bytes) -> str:
+        line = raw.decode("utf-8", errors="replace").rstrip()
+        self.lines += 1
+        self.tail.append(line)
+        if not self._log:
+            console.print(line, markup=False, highlight=False)
+            return line
+        self._log.write(raw)
+        if ERROR_PATTERN.search(line):
+            console.print(line, style="red", markup=False, highlight=False)
+        self._refresh(line)
+        return line
+
+    def highlight(self, message: str) -> None:
+        console.print(message, style="bold green", markup=False, highlight=False)
+
+    def _refresh(self, line: str) -> None:
+        now = time.monotonic()
+        interval = REFRESH_INTERVAL if self._status else CI_REFRESH_INTERVAL
+        if now - self._last_refresh < interval:
+            return
+        self._last_refresh = now
+        progress = f"{self.label}: {self.lines} lines | {line[:80]}"
+        if self._status:
+            self._status.update(progress)
+        else:
+            console.print(progress, markup=False, highlight=False)
+
+    def close(self, failed: bool = False) -> None:
+        if not self._log:
+            return
+        self._log.close()
+        self._log = None
+        if self._status:
+            self._status.stop()
+        if failed:
+            for line in list(self.tail)[-20:]:
+                console.print(line, markup=False, highlight=False)
+        console.print(f"[dim]{self.label}: {self.lines} lines logged to {self.log_path}[/dim]")
+
+
+def _stream_command(cmd: list[str], cwd: Path | None = None, log_path: Path | None = None) -> str:
     process = subprocess.Popen(
         cmd,
         cwd=str(cwd) if cwd else None,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        text=True,
     )
-    last_output = ""
     if not process.stdout:
         return ""
-    for line in process.stdout:
-        console.print(line.rstrip())
-        last_output += line
-    process.wait()
+    sink = _OutputSink(" ".join(cmd[:3]), log_path)
+    try:
+        for raw in process.stdout:
+            sink.write(raw)
+        process.wait()
+    finally:
+        sink.close(failed=process.returncode not in (0, None))
     if process.returncode != 0:
         raise RuntimeError(f"Command failed: {' '.join(cmd)}")
-    return last_output
+    return "\n".join(sink.tail)
 
 
-def bootstrap_expo(workspace_root: Path, project_dir: str, no_install: bool) -> None:
+def bootstrap_expo(
+    workspace_root: Path,
+    project_dir: str,
+    no_install: bool,
+    log_path: Path | None = None,
+) -> None:
     target = workspace_root / project_dir
     if target.exists():
         return
@@ -44,7 +135,12 @@ def bootstrap_expo(workspace_root: Path, project_dir: str, no_install: bool) ->
     ]
     if no_install:
         cmd.append("--no-install")
-    _stream_command(cmd, cwd=workspace_root)
+    _stream_command(cmd, cwd=workspace_root, log_path=log_path)
+
+
+def export_expo_web(project_root: Path, output_dir: Path, log_path: Path | None = None) -> None:
+    cmd = ["npx", "expo", "export", "--platform", "web", "--output-dir", str(output_dir)]
+    _stream_command(cmd, cwd=project_root, log_path=log_path)
 
 
 def _needs_web_deps(output: str) -> bool:
@@ -69,7 +165,11 @@ def _detect_missing_deps(output: str) -> list[str] | None:
     return None
 
 
-def run_expo_web(project_root: Path, port: int | None = None) -> str | None:
+def run_expo_web(
+    project_root: Path,
+    port: int | None = None,
+    log_path: Path | None = None,
+) -> str | None:
     cmd = ["npx", "expo", "start", "--web"]
     if port:
         cmd.extend(["--port", str(port)])
@@ -78,36 +178,41 @@ def run_expo_web(project_root: Path, port: int | None = None) -> str | None:
         cwd=str(project_root),
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        text=True,
     )
     if not process.stdout:
         return None
+    sink = _OutputSink("expo start", log_path)
     found_url = None
-    output = ""
     to_install: list[str] | None = None
-    for line in process.stdout:
-        console.print(line.rstrip())
-        output += line
-        if not found_url:
-            match = URL_PATTERN.search(line)
-            if match:
-                found_url = match.group(1)
-        if not to_install:
-            to_install = _detect_missing_deps(line) or _detect_missing_deps(output)
-            if to_install:
-                break
-    if to_install:
-        process.terminate()
+    try:
+        for raw in process.stdout:
+            line = sink.write(raw)
+            if not found_url:
+                match = URL_PATTERN.search(line)
+                if match:
+                    found_url = match.group(1)
+                    if sink.quiet:
+                        sink.highlight(f"Expo web: {found_url}")
+            # Dependency hints can span several lines; only re-scan the recent
+            # tail when the current line mentions one of them.
+            if not to_install and any(marker in line for marker in DEP_MARKERS):
+                to_install = _detect_missing_deps(line) or _detect_missing_deps("\n".join(sink.tail))
+                if to_install:
+                    break
+        if to_install:
+            process.terminate()
         process.wait()
+    finally:
+        sink.close(failed=not to_install and process.returncode not in (0, None))
+    if to_install:
         console.print("[yellow]Installing missing dependencies...[/yellow]")
-        _stream_command(["npx", "expo", "install", *to_install], cwd=project_root)
-        return run_expo_web(project_root, port=port)
-    process.wait()
+        _stream_command(["npx", "expo", "install", *to_install], cwd=project_root, log_path=log_path)
+        return run_expo_web(project_root, port=port, log_path=log_path)
     if process.returncode != 0:
-        to_install = _detect_missing_deps(output)
+        to_install = _detect_missing_deps("\n".join(sink.tail))
         if to_install:
             console.print("[yellow]Installing missing dependencies...[/yellow]")
-            _stream_command(["npx", "expo", "install", *to_install], cwd=project_root)
-            return run_expo_web(project_root, port=port)
+            _stream_command(["npx", "expo", "install", *to_install], cwd=project_root, log_path=log_path)
+            return run_expo_web(project_root, port=port, log_path=log_path)
         raise RuntimeError(f"Command failed: {' '.join(cmd)}")
     return found_url
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import json
+from copy import deepcopy
+from typing import Any
+
+from .workspace import Workspace
+
+BASELINE_VERSION = "1.0.0"
+
+THEME_PATH = "src/ui/theme.ts"
+SCREEN_PATH = "src/ui/Screen.tsx"
+HEADER_PATH = "src/ui/AppHeader.tsx"
+BASELINE_PATHS = [THEME_PATH, SCREEN_PATH, HEADER_PATH]
+
+DEFAULT_THEME: dict[str, Any] = {
+    "colors": {
+        "background": "#F7F7F9",
+        "surface": "#FFFFFF",
+        "primary": "#2563EB",
+        "onPrimary": "#FFFFFF",
+        "text": "#111827",
+        "mutedText": "#6B7280",
+        "border": "#E5E7EB",
+        "danger": "#DC2626",
+    },
+    "spacing": {"xs": 4, "sm": 8, "md": 12, "lg": 16, "xl": 20},
+    "radius": {"sm": 8, "md": 12, "lg": 16},
+    "fontSize": {"sm": 13, "md": 15, "lg": 17, "title": 20},
+    "minTouchHeight": 44,
+}
+
+API_SURFACE = """Shared UI baseline (provided by umabuild, already present in the project; do NOT output these files):
+- src/ui/theme.ts: `export const theme` (also default export) with
+  colors { background, surface, primary, onPrimary, text, mutedText, border, danger },
+  spacing { xs: 4, sm: 8, md: 12, lg: 16, xl: 20 }, radius { sm: 8, md: 12, lg: 16 },
+  fontSize { sm, md, lg, title }, minTouchHeight: 44; `export type Theme`.
+- src/ui/Screen.tsx: `export function Screen(props: { children: React.ReactNode; header?: React.ReactNode; scroll?: boolean; style?: StyleProp<ViewStyle> })`
+  (also default export). Safe area, background color and 16-20 padding with 12-16 vertical gaps.
+- src/ui/AppHeader.tsx: `export function AppHeader(props: { title: string; right?: React.ReactNode })`
+  (also default export). Title on the left, optional right action, subtle bottom divider.
+Import them with relative paths (e.g. `import { Screen } from './src/ui/Screen'`).
+To restyle, return `theme_overrides` with only the keys to change (same shape as theme).
+"""
+
+_HEADER = f"// umabuild UI baseline v{BASELINE_VERSION}. Managed by umabuild; use theme_overrides to customise.\n"
+
+SCREEN_TSX = _HEADER + """import React from 'react';
+import { SafeAreaView, ScrollView, StyleProp, StyleSheet, View, ViewStyle } from 'react-native';
+import { theme } from './theme';
+
+type ScreenProps = {
+  children: React.ReactNode;
+  header?: React.ReactNode;
+  scroll?: boolean;
+  style?: StyleProp<ViewStyle>;
+};
+
+export function Screen({ children, header, scroll = false, style }: ScreenProps) {
+  const body = scroll ? (
+    <ScrollView contentContainerStyle={[styles.content, style]}>{children}</ScrollView>
+  ) : (
+    <View style={[styles.content, styles.fill, style]}>{children}</View>
+  );
+  return (
+    <SafeAreaView style={styles.safeArea}>
+      {header}
+      {body}
+    </SafeAreaView>
+  );
+}
+
+const styles = StyleSheet.create({
+  safeArea: {
+    flex: 1,
+    backgroundColor: theme.colors.background,
+  },
+  fill: {
+    flex: 1,
+  },
+  content: {
+    paddingHorizontal: theme.spacing.lg,
+    paddingVertical: theme.spacing.md,
+    gap: theme.spacing.md,
+  },
+});
+
+export default Screen;
+"""
+
+HEADER_TSX = _HEADER + """import React from 'react';
+import { StyleSheet, Text, View } from 'react-native';
+import { theme } from './theme';
+
+type AppHeaderProps = {
+  title: string;
+  right?: React.ReactNode;
+};
+
+export function AppHeader({ title, right }: AppHeaderProps) {
+  return (
+    <View style={styles.header}>
+      <Text style={styles.title} numberOfLines={1}>
+        {title}
+      </Text>
+      {right ? <View style={styles.right}>{right}</View> : null}
+    </View>
+  );
+}
+
+const styles = StyleSheet.create({
+  header: {
+    minHeight: theme.minTouchHeight + theme.spacing.md,
+    paddingHorizontal: theme.spacing.lg,
+    flexDirection: 'row',
+    alignItems: 'center',
+    backgroundColor: theme.colors.surface,
+    borderBottomWidth: StyleSheet.hairlineWidth,
+    borderBottomColor: theme.colors.border,
+  },
+  title: {
+    flex: 1,
+    fontSize: theme.fontSize.title,
+    fontWeight: '600',
+    color: theme.colors.text,
+  },
+  right: {
+    marginLeft: theme.spacing.md,
+  },
+});
+
+export default AppHeader;
+"""
+
+
+def merge_overrides(
+    stored: dict[str, Any] | None, new: dict[str, Any] | None
+) -> dict[str, Any] | None:
+    """Deep-merge newly returned overrides onto the stored ones."""
+    if not new:
+        return stored
+    merged = deepcopy(stored) if stored else {}
+
+    def merge(base: dict[str, Any], patch: dict[str, Any]) -> None:
+        for key, value in patch.items():
+            if isinstance(value, dict) and isinstance(base.get(key), dict):
+                merge(base[key], value)
+            else:
+                base[key] = deepcopy(value)
+
+    merge(merged, new)
+    return merged
+
+
+def merge_theme(overrides: dict[str, Any] | None) -> dict[str, Any]:
+    """Apply overrides onto the default theme, ignoring unknown keys and wrong types."""
+
+    def merge(base: dict[str, Any], patch: dict[str, Any]) -> None:
+        for key, value in patch.items():
+            if key not in base:
+                continue
+            current = base[key]
+            if isinstance(current, dict):
+                if isinstance(value, dict):
+                    merge(current, value)
+            elif isinstance(current, str) and isinstance(value, str):
+                base[key] = value
+            elif isinstance(current, (int, float)) and isinstance(value, (int, float)):
+                if not isinstance(value, bool):
+                    base[key] = value
+
+    theme = deepcopy(DEFAULT_THEME)
+    if overrides:
+        merge(theme, overrides)
+    return theme
+
+
+def render_theme(theme: dict[str, Any]) -> str:
+    return (
+        _HEADER
+        + f"export const theme = {json.dumps(theme, indent=2)} as const;\n\n"
+        + "export type Theme = typeof theme;\n\n"
+        + "export default theme;\n"
+    )
+
+
+def render_baseline(overrides: dict[str, Any] | None = None) -> dict[str, str]:
+    return {
+        THEME_PATH: render_theme(merge_theme(overrides)),
+        SCREEN_PATH: SCREEN_TSX,
+        HEADER_PATH: HEADER_TSX,
+    }
+
+
+def version_tuple(version: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in version.split(".") if part.isdigit())
+
+
+def adopts_baseline(workspace: Workspace) -> bool:
+    """Whether umabuild owns the baseline files in this workspace.
+
+    Workspaces generated before the shipped baseline have model-written
+    `src/ui` files with their own API; those are left to the model unless they
+    already match the default baseline.
+    """
+    if workspace.load_ui_baseline() is not None:
+        return True
+    for rel_path, content in render_baseline().items():
+        file_path = workspace.project_path / rel_path
+        if file_path.exists() and file_path.read_text(encoding="utf-8") != content:
+            return False
+    return True
@@ -6,12 +6,14 @@ import re
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable
 
 from rich.console import Console
 
 console = Console()
 
+MODEL_STATS_WINDOW = 20
+
 SECRET_PATTERNS = [
     re.compile(r"(?i)(api[_-]?key|secret|token|password)")
 ]
@@ -65,6 +67,54 @@ class Workspace:
     def log_path(self) -> Path:
         return self.meta_dir / "generation_log.jsonl"
 
+    @property
+    def churn_path(self) -> Path:
+        return self.meta_dir / "churn.json"
+
+    @property
+    def objects_dir(self) -> Path:
+        return self.meta_dir / "objects"
+
+    @property
+    def generations_dir(self) -> Path:
+        return self.meta_dir / "generations"
+
+    @property
+    def head_path(self) -> Path:
+        return self.meta_dir / "HEAD"
+
+    @property
+    def model_stats_path(self) -> Path:
+        return self.meta_dir / "model_stats.json"
+
+    @property
+    def lock_path(self) -> Path:
+        return self.meta_dir / "lock"
+
+    @property
+    def inflight_path(self) -> Path:
+        return self.meta_dir / "inflight.json"
+
+    @property
+    def providers_path(self) -> Path:
+        return self.meta_dir / "providers.json"
+
+    @property
+    def ui_baseline_path(self) -> Path:
+        return self.meta_dir / "ui_baseline.json"
+
+    @property
+    def exports_dir(self) -> Path:
+        return self.meta_dir / "exports"
+
+    @property
+    def logs_dir(self) -> Path:
+        return self.meta_dir / "logs"
+
+    def run_log_path(self, label: str) -> Path:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        return self.logs_dir / f"{label}-{stamp}.log"
+
     def ensure_meta(self) -> None:
         self.meta_dir.mkdir(parents=True, exist_ok=True)
 
@@ -101,13 +151,94 @@ class Workspace:
         unique = sorted({p.replace("\\", "/") for p in paths})
         self.managed_path.write_text(json.dumps(unique, indent=2), encoding="utf-8")
 
+    def load_churn(self) -> dict[str, int]:
+        if not self.churn_path.exists():
+            return {}
+        try:
+            data = json.loads(self.churn_path.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                return {str(k): int(v) for k, v in data.items()}
+        except (json.JSONDecodeError, ValueError, TypeError):
+            return {}
+        return {}
+
+    def record_churn(self, paths: Iterable[str]) -> None:
+        changed = [p.replace("\\", "/") for p in paths]
+        if not changed:
+            return
+        self.ensure_meta()
+        churn = self.load_churn()
+        for path in changed:
+            churn[path] = churn.get(path, 0) + 1
+        self.churn_path.write_text(json.dumps(churn, indent=2, sort_keys=True), encoding="utf-8")
+
+    def load_ui_baseline(self) -> dict | None:
+        if not self.ui_baseline_path.exists():
+            return None
+        try:
+            data = json.loads(self.ui_baseline_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def load_theme_overrides(self) -> dict | None:
+        data = self.load_ui_baseline() or {}
+        overrides = data.get("theme_overrides")
+        return overrides if isinstance(overrides, dict) else None
+
+    def save_ui_baseline(self, version: str, overrides: dict | None) -> None:
+        self.ensure_meta()
+        data = {"version": version, "theme_overrides": overrides}
+        self.ui_baseline_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+
+    def load_inflight(self) -> dict[str, str]:
+        if not self.inflight_path.exists():
+            return {}
+        try:
+            data = json.loads(self.inflight_path.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                return {str(k): str(v) for k, v in data.items()}
+        except json.JSONDecodeError:
+            return {}
+        return {}
+
+    def save_inflight(self, record: dict[str, str]) -> None:
+        self.ensure_meta()
+        self.inflight_path.write_text(json.dumps(record, indent=2, sort_keys=True), encoding="utf-8")
+
+    def load_model_stats(self) -> dict[str, dict[str, Any]]:
+        if not self.model_stats_path.exists():
+            return {}
+        try:
+            data = json.loads(self.model_stats_path.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                return data
+        except json.JSONDecodeError:
+            return {}
+        return {}
+
+    def record_model_outcome(self, model: str, ok: bool) -> None:
+        self.ensure_meta()
+        stats = self.load_model_stats()
+        entry = stats.setdefault(model, {"attempts": 0, "failures": 0})
+        entry["attempts"] = entry.get("attempts", 0) + 1
+        if not ok:
+            entry["failures"] = entry.get("failures", 0) + 1
+        # Routing judges models on recent outcomes only (1 = failure), so an
+        # old bad streak ages out instead of disabling a tier for good.
+        recent = entry.get("recent")
+        recent = recent if isinstance(recent, list) else []
+        entry["recent"] = (recent + [0 if ok else 1])[-MODEL_STATS_WINDOW:]
+        self.model_stats_path.write_text(json.dumps(stats, indent=2, sort_keys=True), encoding="utf-8")
+
     def log_generation(self, payload: dict) -> None:
         self.ensure_meta()
         extra = [os.getenv("OPENAI_API_KEY", "")]
-        redacted = json.loads(_redact_text(json.dumps(payload), extra))
-        redacted["ts"] = datetime.utcnow().isoformat() + "Z"
+        # Serialize once and redact the encoded line, rather than round-tripping
+        # large responses through several intermediate copies.
+        line = json.dumps({**payload, "ts": datetime.utcnow().isoformat() + "Z"})
         with self.log_path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(redacted) + "\n")
+            handle.write(_redact_text(line, extra) + "\n")
 
     def extract_summary(self, text: str) -> dict:
         lines = [line.strip() for line in text.splitlines() if line.strip()]
@@ -4,6 +4,7 @@ import pytest
 
 from umabuild.core.generator import GenerationError, generate_app
 from umabuild.core.llm.base import LLMProvider
+from umabuild.core.router import ModelRouter
 from umabuild.core.workspace import Workspace
 
 
@@ -38,3 +39,129 @@ def test_json_retry_fail(tmp_path: Path) -> None:
     ws = Workspace(root=tmp_path)
     with pytest.raises(GenerationError):
         generate_app(ws, provider, model="test", mode="new")
+
+
+def test_uses_spec_text_passed_in(tmp_path: Path) -> None:
+    (tmp_path / "README.md").write_text("# Edited while waiting", encoding="utf-8")
+    seen: list = []
+
+    class RecordingProvider(FakeProvider):
+        def generate(self, messages, model, temperature=0.2, **kwargs):
+            seen.append(messages[-1]["content"])
+            return super().generate(messages, model, temperature, **kwargs)
+
+    provider = RecordingProvider(
+        ['{"files": [{"path": "App.tsx", "content": "ok"}], "managed_paths": ["App.tsx"]}']
+    )
+    generate_app(Workspace(root=tmp_path), provider, model="test", mode="new", spec_text="# Snapshot")
+    assert "# Snapshot" in seen[0]
+    assert "Edited while waiting" not in seen[0]
+
+
+VALID_OUTPUT = (
+    '{"files": ['
+    '{"path": "App.tsx", "content": "ok"}, '
+    '{"path": "src/ui/theme.ts", "content": "t"}, '
+    '{"path": "src/ui/Screen.tsx", "content": "s"}, '
+    '{"path": "src/ui/AppHeader.tsx", "content": "h"}], '
+    '"managed_paths": ["App.tsx", "src/ui/theme.ts", "src/ui/Screen.tsx", "src/ui/AppHeader.tsx"]}'
+)
+
+
+class RecordingProvider(FakeProvider):
+    def __init__(self, outputs: list[str]):
+        super().__init__(outputs)
+        self.messages: list[list[dict]] = []
+
+    def generate(self, messages, model, temperature=0.2, **kwargs):
+        self.messages.append([dict(m) for m in messages])
+        return super().generate(messages, model, temperature, **kwargs)
+
+
+def test_prompt_prefix_is_stable_and_ordered_by_churn(tmp_path: Path) -> None:
+    (tmp_path / "README.md").write_text("# App\n\n## Screens\n- Home", encoding="utf-8")
+    project = tmp_path / "app"
+    project.mkdir()
+    (project / "App.tsx").write_text("app", encoding="utf-8")
+    (project / "Stable.tsx").write_text("stable", encoding="utf-8")
+    ws = Workspace(root=tmp_path)
+    ws.save_managed(["App.tsx", "Stable.tsx"])
+    ws.record_churn(["App.tsx"])
+
+    provider = RecordingProvider([VALID_OUTPUT, VALID_OUTPUT])
+    generate_app(ws, provider, model="test", mode="iterate")
+    (tmp_path / "README.md").write_text("# Other\n\n## Screens\n- Feed", encoding="utf-8")
+    generate_app(ws, provider, model="test", mode="iterate")
+
+    first, second = provider.messages
+    assert first[0] == second[0]
+    user = first[1]["content"]
+    assert user.index("- Stable.tsx:") < user.index("- App.tsx:") < user.index("App spec")
+
+
+def test_output_is_spilled_and_retry_prompt_is_bounded(tmp_path: Path) -> None:
+    (tmp_path / "README.md").write_text("# App", encoding="utf-8")
+    huge_invalid = '{"files": [' + '{"path": "A.tsx", "content": "' + "x" * 100_000 + '"},'
+    provider = RecordingProvider([huge_invalid, VALID_OUTPUT])
+    ws = Workspace(root=tmp_path)
+    result = generate_app(ws, provider, model="test", mode="new")
+
+    retry_prompt = provider.messages[1][-1]["content"]
+    assert len(retry_prompt) < 6000
+
+    app_file = next(f for f in result.output.files if f.path == "App.tsx")
+    assert app_file.spill_path is not None and app_file.spill_path.exists()
+    assert app_file.content == ""
+    assert app_file.read_text() == "ok"
+    result.cleanup()
+    assert not app_file.spill_path.exists()
+
+
+def test_file_without_content_is_rejected(tmp_path: Path) -> None:
+    (tmp_path / "README.md").write_text("# App", encoding="utf-8")
+    provider = FakeProvider(['{"files": [{"path": "App.tsx"}], "managed_paths": ["App.tsx"]}'] * 3)
+    with pytest.raises(GenerationError):
+        generate_app(Workspace(root=tmp_path), provider, model="test", mode="new")
+
+
+def test_spill_dir_removed_when_attempt_raises(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import tempfile
+
+    spill_root = tmp_path / "spill"
+    spill_root.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(spill_root))
+    (tmp_path / "README.md").write_text("# App", encoding="utf-8")
+    ws = Workspace(root=tmp_path)
+
+    def broken_log(payload: dict) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ws, "log_generation", broken_log)
+    with pytest.raises(OSError):
+        generate_app(ws, FakeProvider([VALID_OUTPUT]), model="test", mode="new")
+    assert list(spill_root.iterdir()) == []
+
+
+def test_truncated_output_retries_with_larger_budget(tmp_path: Path) -> None:
+    (tmp_path / "README.md").write_text("# App", encoding="utf-8")
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "App.tsx").write_text("app", encoding="utf-8")
+    ws = Workspace(root=tmp_path)
+    ws.save_managed(["App.tsx"])
+
+    class TruncatingProvider(FakeProvider):
+        def __init__(self, outputs: list[str]):
+            super().__init__(outputs)
+            self.budgets: list = []
+
+        def generate(self, messages, model, temperature=0.2, **kwargs):
+            self.budgets.append(kwargs.get("max_tokens"))
+            self.last_finish_reason = "length" if self.calls == 0 else "stop"
+            return super().generate(messages, model, temperature, **kwargs)
+
+    provider = TruncatingProvider(['{"files": [{"path": "App.tsx", "content": "o', VALID_OUTPUT])
+    router = ModelRouter(tiers=["fast", "strong"])
+    generate_app(ws, provider, model="auto", mode="iterate", router=router)
+
+    assert provider.budgets == [2048, 4096]
+    assert ws.load_model_stats()["fast"]["recent"] == [0]
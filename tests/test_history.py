@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from umabuild.core.history import checkout, list_generations, record_generation, rollback
+from umabuild.core.workspace import Workspace
+
+
+def _write(ws: Workspace, files: dict[str, str], spec: str) -> None:
+    for rel_path, content in files.items():
+        target = ws.project_path / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding="utf-8")
+    ws.save_managed(list(files))
+    ws.save_spec_snapshot(spec)
+
+
+def test_rollback_and_checkout_restore_managed_state(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    ws.project_path.mkdir()
+    _write(ws, {"App.tsx": "v1", "src/ui/theme.ts": "theme"}, "# v1")
+    first = record_generation(ws, mode="new")
+    _write(ws, {"App.tsx": "v2", "src/ui/theme.ts": "theme", "Extra.tsx": "x"}, "# v2")
+    second = record_generation(ws, mode="iterate")
+
+    assert [g.id for g in list_generations(ws)] == [second.id, first.id]
+    # Unchanged files share a single blob.
+    assert first.files["src/ui/theme.ts"] == second.files["src/ui/theme.ts"]
+
+    rollback(ws)
+    # The generation rolled back from stays listed so it can be checked out again.
+    assert [g.id for g in list_generations(ws)] == [second.id, first.id]
+    assert (ws.project_path / "App.tsx").read_text(encoding="utf-8") == "v1"
+    assert not (ws.project_path / "Extra.tsx").exists()
+    assert ws.spec_snapshot_path.read_text(encoding="utf-8") == "# v1"
+    assert sorted(ws.load_managed()) == ["App.tsx", "src/ui/theme.ts"]
+
+    checkout(ws, second.id[:6])
+    assert (ws.project_path / "Extra.tsx").read_text(encoding="utf-8") == "x"
+    assert ws.spec_snapshot_path.read_text(encoding="utf-8") == "# v2"
+
+
+def test_rollback_restores_theme_overrides(tmp_path: Path) -> None:
+    from umabuild.core.generator import GenerationOutput
+    from umabuild.core.patcher import apply_generation
+
+    ws = Workspace(root=tmp_path)
+    ws.project_path.mkdir()
+    red = GenerationOutput(files=[], managed_paths=[], theme_overrides={"colors": {"primary": "#FF0000"}})
+    blue = GenerationOutput(files=[], managed_paths=[], theme_overrides={"colors": {"primary": "#0000FF"}})
+    apply_generation(ws, red, mode="new")
+    record_generation(ws, mode="new")
+    apply_generation(ws, blue, mode="iterate")
+    record_generation(ws, mode="iterate")
+
+    rollback(ws)
+    assert ws.load_theme_overrides() == {"colors": {"primary": "#FF0000"}}
+    # The next iterate must not re-render the newer overrides.
+    apply_generation(ws, GenerationOutput(files=[], managed_paths=[]), mode="iterate")
+    theme = (ws.project_path / "src/ui/theme.ts").read_text(encoding="utf-8")
+    assert '"primary": "#FF0000"' in theme
@@ -0,0 +1,84 @@
+import threading
+from pathlib import Path
+
+from umabuild.core.history import record_generation, rollback
+from umabuild.core.lock import WorkspaceLock, single_flight
+from umabuild.core.workspace import Workspace
+
+
+def _waiter(ws: Workspace, spec: str, results: list) -> None:
+    with single_flight(ws, spec) as reused:
+        results.append(reused)
+
+
+def _run_with_waiter(ws: Workspace, inflight_spec: str, waiter_spec: str) -> list:
+    results: list = []
+    with single_flight(ws, inflight_spec) as reused:
+        assert reused is None
+        waiter = threading.Thread(target=_waiter, args=(ws, waiter_spec, results))
+        waiter.start()
+        waiter.join(timeout=0.5)
+        assert waiter.is_alive()  # queued behind the in-flight generation
+        ws.save_spec_snapshot(inflight_spec)
+        record_generation(ws, mode="iterate")
+    waiter.join(timeout=5)
+    return results
+
+
+def test_waiter_reuses_generation_for_same_spec(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    ws.project_path.mkdir()
+    results = _run_with_waiter(ws, "# Same", "# Same")
+    assert results and results[0] is not None
+
+
+def test_waiter_with_other_spec_generates_again(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    ws.project_path.mkdir()
+    results = _run_with_waiter(ws, "# One", "# Two")
+    assert results == [None]
+
+
+def test_waiter_arriving_after_record_still_reuses(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    ws.project_path.mkdir()
+    results: list = []
+    with single_flight(ws, "# Same") as reused:
+        assert reused is None
+        ws.save_spec_snapshot("# Same")
+        generation = record_generation(ws, mode="iterate")
+        # Arrives between record and release (e.g. while the export refreshes).
+        waiter = threading.Thread(target=_waiter, args=(ws, "# Same", results))
+        waiter.start()
+        waiter.join(timeout=0.5)
+        assert waiter.is_alive()
+    waiter.join(timeout=5)
+    assert results and results[0] is not None
+    assert results[0].id == generation.id
+
+
+def test_waiter_does_not_reuse_generation_rolled_back_meanwhile(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    ws.project_path.mkdir()
+    ws.save_spec_snapshot("# Old")
+    record_generation(ws, mode="new")
+    with single_flight(ws, "# Same"):
+        ws.save_spec_snapshot("# Same")
+        record_generation(ws, mode="iterate")
+    results: list = []
+    with WorkspaceLock(ws):
+        waiter = threading.Thread(target=_waiter, args=(ws, "# Same", results))
+        waiter.start()
+        waiter.join(timeout=0.5)
+        rollback(ws)
+    waiter.join(timeout=5)
+    assert results == [None]
+
+
+def test_lock_is_exclusive(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    with WorkspaceLock(ws):
+        assert not WorkspaceLock(ws).acquire(blocking=False)
+    other = WorkspaceLock(ws)
+    assert other.acquire(blocking=False)
+    other.release()
@@ -0,0 +1,80 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from umabuild.core.generator import generate_app
+from umabuild.core.llm.mock_server import FaultConfig, MockServer
+from umabuild.core.llm.openai_provider import OpenAIProvider
+from umabuild.core.loadtest import LoadTestReport, run_load_test
+from umabuild.core.workspace import Workspace
+
+
+def _provider(monkeypatch: pytest.MonkeyPatch, server: MockServer) -> OpenAIProvider:
+    monkeypatch.setenv("OPENAI_API_KEY", "mock")
+    monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+    return OpenAIProvider()
+
+
+def test_generate_against_mock(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "README.md").write_text("# App", encoding="utf-8")
+    with MockServer() as server:
+        result = generate_app(Workspace(root=tmp_path), _provider(monkeypatch, server), model="m", mode="new")
+    assert any(f.path == "App.tsx" for f in result.output.files)
+    assert server.stats.statuses == {200: 1}
+
+
+def test_load_test_reports_injected_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    with MockServer(faults=FaultConfig(rate_limit_rate=1.0)) as server:
+        report = run_load_test(_provider(monkeypatch, server), requests=4, concurrency=2)
+    assert report.succeeded == 0
+    assert report.failed == 4
+    assert report.throughput == 0
+    assert report.request_rate > 0
+    assert server.stats.statuses == {429: 4}
+
+
+def test_percentiles_use_nearest_rank() -> None:
+    report = LoadTestReport(requests=5, concurrency=1, wall_seconds=1.0, latencies=[5, 1, 4, 2, 3])
+    assert report.percentile(50) == 3
+    assert report.percentile(90) == 5
+    assert report.percentile(20) == 1
+    assert report.percentile(100) == 5
+
+
+def test_usage_is_tracked_per_thread(monkeypatch: pytest.MonkeyPatch) -> None:
+    with MockServer() as server:
+        provider = _provider(monkeypatch, server)
+        seen: list = []
+
+        def call() -> None:
+            provider.generate([{"role": "user", "content": "x" * 400}], model="m")
+            seen.append((provider.last_usage, provider.last_finish_reason))
+
+        worker = threading.Thread(target=call)
+        worker.start()
+        worker.join()
+    usage, finish_reason = seen[0]
+    assert usage["prompt_tokens"] == 100
+    assert finish_reason == "stop"
+    assert provider.last_usage is None
+
+
+def test_loadtest_command_builds_provider_from_registry(tmp_path: Path) -> None:
+    import json
+
+    from typer.testing import CliRunner
+
+    from umabuild.cli import app
+
+    ws = Workspace(root=tmp_path)
+    ws.ensure_meta()
+    ws.providers_path.write_text(
+        json.dumps({"vllm": {"models": ["local-model"], "concurrency": 2}}), encoding="utf-8"
+    )
+    args = ["loadtest", "--requests", "4", "--concurrency", "4"]
+    args += ["--provider", "vllm", "--workspace", str(tmp_path)]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0, result.output
+    assert "via vllm" in result.output
+    assert "Succeeded" in result.output
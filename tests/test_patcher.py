@@ -2,6 +2,7 @@ from pathlib import Path
 
 from umabuild.core.generator import GenerationOutput, GeneratedFile
 from umabuild.core.patcher import apply_generation
+from umabuild.core.ui_baseline import BASELINE_VERSION
 from umabuild.core.workspace import Workspace
 
 
@@ -26,3 +27,72 @@ def test_iterate_only_overwrites_managed(tmp_path: Path) -> None:
 
     assert (project / "App.tsx").read_text(encoding="utf-8") == "new"
     assert (project / "Extra.tsx").read_text(encoding="utf-8") == "keep"
+
+
+def test_ui_baseline_written_with_theme_overrides(tmp_path: Path) -> None:
+    project = tmp_path / "app"
+    project.mkdir()
+    ws = Workspace(root=tmp_path)
+
+    output = GenerationOutput(
+        files=[
+            GeneratedFile(path="App.tsx", content="app"),
+            GeneratedFile(path="src/ui/Screen.tsx", content="model copy"),
+        ],
+        managed_paths=["App.tsx"],
+        theme_overrides={"colors": {"primary": "#FF0000"}, "unknown": 1},
+    )
+    apply_generation(ws, output, mode="new")
+
+    theme = (project / "src/ui/theme.ts").read_text(encoding="utf-8")
+    assert '"primary": "#FF0000"' in theme
+    assert "unknown" not in theme
+    assert "model copy" not in (project / "src/ui/Screen.tsx").read_text(encoding="utf-8")
+    assert "src/ui/AppHeader.tsx" in ws.load_managed()
+
+    # Overrides persist across iterations that do not restate them.
+    apply_generation(ws, GenerationOutput(files=[], managed_paths=[]), mode="iterate")
+    assert '"primary": "#FF0000"' in (project / "src/ui/theme.ts").read_text(encoding="utf-8")
+
+
+def test_successive_partial_theme_overrides_are_merged(tmp_path: Path) -> None:
+    (tmp_path / "app").mkdir()
+    ws = Workspace(root=tmp_path)
+    first = GenerationOutput(files=[], managed_paths=[], theme_overrides={"colors": {"primary": "#FF0000"}})
+    second = GenerationOutput(
+        files=[], managed_paths=[], theme_overrides={"colors": {"background": "#000000"}}
+    )
+    apply_generation(ws, first, mode="new")
+    apply_generation(ws, second, mode="iterate")
+
+    theme = (tmp_path / "app" / "src/ui/theme.ts").read_text(encoding="utf-8")
+    assert '"primary": "#FF0000"' in theme
+    assert '"background": "#000000"' in theme
+    assert ws.load_theme_overrides() == {"colors": {"primary": "#FF0000", "background": "#000000"}}
+
+
+def test_legacy_ui_files_are_not_taken_over(tmp_path: Path) -> None:
+    project = tmp_path / "app"
+    (project / "src/ui").mkdir(parents=True)
+    (project / "src/ui/Screen.tsx").write_text("legacy screen", encoding="utf-8")
+    ws = Workspace(root=tmp_path)
+    ws.save_managed(["App.tsx", "src/ui/Screen.tsx"])
+
+    output = GenerationOutput(
+        files=[GeneratedFile(path="src/ui/Screen.tsx", content="model update")],
+        managed_paths=["src/ui/Screen.tsx"],
+    )
+    apply_generation(ws, output, mode="iterate")
+
+    assert (project / "src/ui/Screen.tsx").read_text(encoding="utf-8") == "model update"
+    assert not (project / "src/ui/theme.ts").exists()
+    assert ws.load_ui_baseline() is None
+
+
+def test_outdated_baseline_version_is_upgraded(tmp_path: Path) -> None:
+    (tmp_path / "app").mkdir()
+    ws = Workspace(root=tmp_path)
+    ws.save_ui_baseline("0.9.0", {"colors": {"primary": "#FF0000"}})
+    apply_generation(ws, GenerationOutput(files=[], managed_paths=[]), mode="iterate")
+    assert ws.load_ui_baseline()["version"] == BASELINE_VERSION
+    assert '"primary": "#FF0000"' in (tmp_path / "app/src/ui/theme.ts").read_text(encoding="utf-8")
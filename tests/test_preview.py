@@ -0,0 +1,69 @@
+import gzip
+import threading
+import urllib.request
+from pathlib import Path
+
+from umabuild.core.preview import CURRENT_FILE, PreviewServer, content_hash
+from umabuild.core.workspace import Workspace
+
+
+def test_content_hash_tracks_managed_files(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    ws.project_path.mkdir()
+    (ws.project_path / "App.tsx").write_text("v1", encoding="utf-8")
+    (ws.project_path / "Unmanaged.tsx").write_text("x", encoding="utf-8")
+    ws.save_managed(["App.tsx"])
+    first = content_hash(ws)
+    (ws.project_path / "Unmanaged.tsx").write_text("y", encoding="utf-8")
+    assert content_hash(ws) == first
+    (ws.project_path / "App.tsx").write_text("v2", encoding="utf-8")
+    assert content_hash(ws) != first
+
+
+def test_preview_server_gzip_and_cache_headers(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    export = ws.exports_dir / "abc"
+    (export / "_expo" / "static" / "js").mkdir(parents=True)
+    (export / "index.html").write_text("<html></html>", encoding="utf-8")
+    bundle = "console.log('hi');\n" * 200
+    (export / "_expo" / "static" / "js" / "entry-1234.js").write_text(bundle, encoding="utf-8")
+    (ws.exports_dir / CURRENT_FILE).write_text("abc", encoding="utf-8")
+
+    server = PreviewServer(ws, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        request = urllib.request.Request(
+            f"{server.url}/_expo/static/js/entry-1234.js", headers={"Accept-Encoding": "gzip"}
+        )
+        with urllib.request.urlopen(request) as resp:
+            assert resp.headers["Content-Encoding"] == "gzip"
+            assert "immutable" in resp.headers["Cache-Control"]
+            assert gzip.decompress(resp.read()).decode("utf-8") == bundle
+        with urllib.request.urlopen(f"{server.url}/profile") as resp:
+            assert resp.headers["Cache-Control"] == "no-cache"
+            assert resp.read() == b"<html></html>"
+    finally:
+        server.shutdown()
+
+
+def test_preview_cache_drops_previous_export(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    for name in ("old", "new"):
+        (ws.exports_dir / name).mkdir(parents=True)
+        (ws.exports_dir / name / "index.html").write_text(name, encoding="utf-8")
+    (ws.exports_dir / CURRENT_FILE).write_text("old", encoding="utf-8")
+
+    server = PreviewServer(ws, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with urllib.request.urlopen(server.url) as resp:
+            assert resp.read() == b"old"
+        (ws.exports_dir / CURRENT_FILE).write_text("new", encoding="utf-8")
+        with urllib.request.urlopen(server.url) as resp:
+            assert resp.read() == b"new"
+        cached = list(server._httpd._cache)
+        assert cached == [(ws.exports_dir / "new" / "index.html").resolve()]
+    finally:
+        server.shutdown()
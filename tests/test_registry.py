@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from umabuild.core.llm.openai_provider import OpenAIProvider
+from umabuild.core.llm.registry import ProviderConfigError, create_provider
+from umabuild.core.workspace import Workspace
+
+
+def test_local_provider_needs_no_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    provider, config = create_provider("llamacpp")
+    assert isinstance(provider, OpenAIProvider)
+    assert provider.base_url == "http://127.0.0.1:8080"
+    assert provider.json_mode
+    assert config.concurrency == 4
+
+
+def test_workspace_config_overrides_and_adds_providers(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    ws.ensure_meta()
+    ws.providers_path.write_text(
+        json.dumps(
+            {
+                "vllm": {"base_url": "http://gpu-box:8000/v1", "models": ["small", "large"]},
+                "lab": {"base_url": "http://127.0.0.1:9000", "require_api_key": False},
+            }
+        ),
+        encoding="utf-8",
+    )
+    provider, config = create_provider("vllm", ws)
+    assert provider.base_url == "http://gpu-box:8000"
+    assert config.models == ["small", "large"]
+    assert config.timeout == 600.0
+
+    lab, _ = create_provider("lab", ws)
+    assert lab.base_url == "http://127.0.0.1:9000"
+
+    with pytest.raises(ProviderConfigError):
+        create_provider("missing", ws)
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [{"concurrency": "2"}, {"models": "qwen"}, {"timeout": -1}, {"capabilities": {"json_mode": "yes"}}],
+)
+def test_invalid_setting_types_are_config_errors(tmp_path: Path, settings: dict) -> None:
+    ws = Workspace(root=tmp_path)
+    ws.ensure_meta()
+    ws.providers_path.write_text(json.dumps({"vllm": settings}), encoding="utf-8")
+    with pytest.raises(ProviderConfigError):
+        create_provider("vllm", ws)
+
+
+def test_broken_plugin_only_fails_when_requested(monkeypatch: pytest.MonkeyPatch) -> None:
+    from importlib.metadata import EntryPoint
+
+    from umabuild.core.llm import registry
+
+    broken = EntryPoint(
+        name="broken", value="umabuild_missing_plugin:factory", group=registry.ENTRY_POINT_GROUP
+    )
+    monkeypatch.setattr(registry, "_plugin_entry_points", lambda: {"broken": broken})
+    provider, _ = create_provider("llamacpp")
+    assert provider.base_url == "http://127.0.0.1:8080"
+    with pytest.raises(ProviderConfigError):
+        create_provider("broken")
+
+
+def test_auto_model_requires_configured_models(tmp_path: Path) -> None:
+    from typer.testing import CliRunner
+
+    from umabuild.cli import app
+
+    (tmp_path / "README.md").write_text("# App", encoding="utf-8")
+    result = CliRunner().invoke(app, ["iterate", "--workspace", str(tmp_path), "--provider", "vllm"])
+    assert result.exit_code == 1
+    assert "no models configured" in result.output
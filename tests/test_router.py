@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from umabuild.core.history import record_generation
+from umabuild.core.router import ModelRouter, RouteSignals, changed_sections
+from umabuild.core.workspace import Workspace
+
+
+def test_changed_sections_only_reports_edits() -> None:
+    before = "# App\n\n## Screens\n- Home\n\n## Features\n- Greeting"
+    after = "# App\n\n## Screens\n- Home\n\n## Features\n- Friendly greeting"
+    assert list(changed_sections(before, after)) == ["features"]
+
+
+def test_small_iterate_uses_fast_tier_and_escalates(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    ws.project_path.mkdir()
+    (ws.project_path / "App.tsx").write_text("app", encoding="utf-8")
+    (ws.project_path / "ProfileScreen.tsx").write_text("profile", encoding="utf-8")
+    ws.save_managed(["App.tsx", "ProfileScreen.tsx"])
+    ws.save_spec_snapshot("# App\n\n## Screens\n- Home\n- Profile")
+    record_generation(ws, mode="new")
+
+    router = ModelRouter(tiers=["fast", "strong"])
+    managed = {"App.tsx": "app", "ProfileScreen.tsx": "profile"}
+    spec = "# App\n\n## Screens\n- Home\n- Profile with avatar"
+    signals = router.signals(ws, "iterate", spec, managed, "prompt")
+    assert signals.changed_sections == 1
+    assert signals.affected_files == 2
+
+    decision = router.route(ws, "iterate", signals)
+    assert decision.model == "fast"
+    assert router.escalate(decision).model == "strong"
+    assert router.route(ws, "new", signals).model == "strong"
+
+
+def test_unreliable_model_is_skipped(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    for _ in range(5):
+        ws.record_model_outcome("fast", ok=False)
+    router = ModelRouter(tiers=["fast", "strong"])
+    signals = RouteSignals(prompt_tokens=10, changed_sections=1, affected_files=1, output_tokens=10)
+    assert router.route(ws, "iterate", signals).model == "strong"
+
+
+def test_small_edit_budget_covers_every_managed_file(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    managed = {f"Screen{i}.tsx": "x" * 6000 for i in range(6)}
+    managed["App.tsx"] = "app"
+    ws.project_path.mkdir()
+    ws.save_spec_snapshot("# App\n\n## Theme\n- Blue")
+    record_generation(ws, mode="new")
+
+    router = ModelRouter(tiers=["fast", "strong"], small_prompt_tokens=100_000)
+    signals = router.signals(ws, "iterate", "# App\n\n## Theme\n- Green", managed, "prompt")
+    assert signals.affected_files == 1
+    # Returning all seven files does not fit a small budget, so use the strong tier.
+    decision = router.route(ws, "iterate", signals)
+    assert decision.model == "strong"
+    assert decision.max_tokens == router.max_output_tokens
+
+    few = {"App.tsx": "app", "Home.tsx": "y" * 3000, "List.tsx": "z" * 3000}
+    signals = router.signals(ws, "iterate", "# App\n\n## Theme\n- Green", few, "prompt")
+    decision = router.route(ws, "iterate", signals)
+    assert decision.model == "fast"
+    assert decision.max_tokens >= sum(len(v) for v in few.values()) // 4
+
+
+def test_old_failures_age_out_of_the_window(tmp_path: Path) -> None:
+    ws = Workspace(root=tmp_path)
+    for _ in range(5):
+        ws.record_model_outcome("fast", ok=False)
+    for _ in range(20):
+        ws.record_model_outcome("fast", ok=True)
+    router = ModelRouter(tiers=["fast", "strong"])
+    signals = RouteSignals(prompt_tokens=10, changed_sections=1, affected_files=1, output_tokens=10)
+    assert router.route(ws, "iterate", signals).model == "fast"
+    assert ws.load_model_stats()["fast"]["attempts"] == 25
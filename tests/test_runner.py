@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from umabuild.core.runner import _stream_command
+
+
+def test_quiet_stream_writes_raw_output_to_log(tmp_path: Path) -> None:
+    log_path = tmp_path / "logs" / "run.log"
+    script = "import sys\nfor i in range(1000): sys.stdout.write(f'line [b]{i}[/b]\\n')"
+    _stream_command([sys.executable, "-c", script], log_path=log_path)
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1000
+    assert lines[-1] == "line [b]999[/b]"
+
+
+def test_quiet_stream_raises_on_failure(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError):
+        _stream_command([sys.executable, "-c", "raise SystemExit(3)"], log_path=tmp_path / "x.log")